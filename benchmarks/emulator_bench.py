@@ -0,0 +1,92 @@
+"""Round-trip latency and throughput of the HID transport against the emulated Ryuo IV.
+
+Drives a real HIDDevice (scheduler, dispatcher, decoder, segmentation) whose
+backend is lib.emulator.EmulatorBackend, so transport changes can be measured
+without hardware.
+
+    python benchmarks/emulator_bench.py [--latency 0.002] [--jitter 0.0005] [--drop 0.0]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from lib.emulator import EmulatorBackend
+from lib.hiddevice import HIDDevice
+from lib.scheduler import IOScheduler
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def bench_keepalive(device: HIDDevice, count: int):
+    rtts = []
+    lost = 0
+    for _ in range(count):
+        start = time.perf_counter()
+        response = device.wait(device.scheduler.submit(IOScheduler.KEEPALIVE, "POST conn"), 1.0)
+        if response is None:
+            lost += 1
+        else:
+            rtts.append((time.perf_counter() - start) * 1000)
+    return rtts, lost
+
+
+def bench_config(device: HIDDevice, entries: int, count: int):
+    media = [f"2025-10-{i % 28 + 1:02d}_12-00-00-{i:03d}.mp4" for i in range(entries)]
+    payload = device.build_display_config(media, 200)
+    start = time.perf_counter()
+    futures = [device.post_config(payload) for _ in range(count)]
+    replies = sum(device.wait(future, 2.0) is not None for future in futures)
+    elapsed = time.perf_counter() - start
+    return len(payload), replies, elapsed
+
+
+def bench_telemetry(device: HIDDevice, payload: str, count: int):
+    start = time.perf_counter()
+    futures = [device.scheduler.submit(IOScheduler.TELEMETRY, "STATE all", payload) for _ in range(count)]
+    for future in futures:
+        device.wait(future, 2.0)
+    return time.perf_counter() - start
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="HID transport benchmark against the Ryuo IV emulator")
+    parser.add_argument("--latency", type=float, default=0.002, help="emulated reply latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0005, help="uniform reply jitter in seconds")
+    parser.add_argument("--drop", type=float, default=0.0, help="probability a request gets no reply")
+    parser.add_argument("--report-size", type=int, default=HIDDevice.REPORT_SIZE)
+    parser.add_argument("--count", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    backend = EmulatorBackend(latency=args.latency, jitter=args.jitter, drop_rate=args.drop, seed=0)
+    device = HIDDevice(0x1C75, 0x1C76, report_size=args.report_size, backend=backend)
+
+    rtts, lost = bench_keepalive(device, args.count)
+    if rtts:
+        print(f"keepalive RTT over {len(rtts)} requests ({lost} lost): "
+              f"p50 {percentile(rtts, 50):.2f} ms, p95 {percentile(rtts, 95):.2f} ms, "
+              f"p99 {percentile(rtts, 99):.2f} ms, mean {statistics.mean(rtts):.2f} ms")
+    else:
+        print(f"keepalive: all {lost} requests lost")
+
+    for entries in (1, 100, 1000):
+        size, replies, elapsed = bench_config(device, entries, max(1, args.count // 10))
+        sent = max(1, args.count // 10)
+        print(f"POST config {entries:>4} entries ({size:>6} B): {sent / elapsed:8.1f} frames/s, "
+              f"{size * sent / elapsed / 1e6:6.2f} MB/s, {replies}/{sent} replies")
+
+    telemetry = '{"cpu":{"load":12,"temperature":47},"memory":{"load":28}}' * 10
+    elapsed = bench_telemetry(device, telemetry, args.count)
+    print(f"STATE all ({len(telemetry)} B): {args.count / elapsed:8.1f} frames/s")
+    print(f"emulator received {backend.emulated.received}, dropped {backend.emulated.dropped}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,120 @@
+"""Round-trip fuzzer for lib.packet.
+
+Runs a fixed corpus of edge cases plus seeded random payloads biased towards the
+MAGIC/ESCAPE bytes and checks that:
+
+- unescape(escape(x)) == x
+- framing a payload and parsing the frame gives the payload back
+- frames split into random chunks with padding in between all come out of
+  PacketDecoder, in order
+- corrupted frames only ever fail with ValueError
+
+    python benchmarks/fuzz_roundtrip.py [--iterations N] [--seed S]
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from lib.packet import Packet, PacketDecoder
+from lib.response import Response
+
+CORPUS = [
+    b"",
+    b"\x5a",
+    b"\x5b",
+    b"\x5a\x5a",
+    b"\x5b\x5b",
+    b"\x5b\x01",
+    b"\x5b\x02",
+    b"\x5b\x02\x01",
+    b"\x5b\x01\x02",
+    b"\x00" * 64,
+    b"\x5a\x5b" * 512,
+    b"\xff" * 255,
+    bytes(range(256)),
+    b"POST conn 1\r\nSeqNumber=1\r\nDate=0\r\nContentType=json\r\nContentLength=0\r\n\r\n",
+    b'STATE all 1\r\nSeqNumber=9\r\n\r\n{"cpu":{"load":90}}',
+    b"\r\n\r\n",
+]
+
+INTERESTING = b"\x5a\x5b\x01\x02\x00\xff\r\n="
+
+
+def random_payload(rng: random.Random) -> bytes:
+    size = rng.choice((rng.randint(0, 16), rng.randint(0, 512), rng.randint(0, 8192)))
+    if rng.random() < 0.5:
+        return bytes(rng.choice(INTERESTING) for _ in range(size))
+    return rng.randbytes(size)
+
+
+def check_payload(payload: bytes) -> None:
+    codec = Packet()
+    assert codec.unescape(codec.escape(payload)) == payload, "escape round-trip"
+
+    frame = bytes(Packet.build_from_payload(payload).get_bytes())
+    assert Packet.MAGIC not in frame[2:-1], "MAGIC inside escaped frame"
+    parsed = Packet.from_bytes(frame[1:])
+    assert parsed.PAYLOAD == payload, "frame round-trip"
+    Response(parsed).header
+
+
+def check_stream(rng: random.Random, payloads: list) -> None:
+    stream = bytearray()
+    for payload in payloads:
+        stream += Packet.build_from_payload(payload).get_bytes()
+        stream += bytes(rng.randint(0, 32))
+
+    decoder = PacketDecoder()
+    decoded = []
+    offset = 0
+    while offset < len(stream):
+        size = rng.randint(1, 1100)
+        decoded += decoder.feed(bytes(stream[offset:offset + size]))
+        offset += size
+
+    assert [p.PAYLOAD for p in decoded] == payloads, "stream round-trip"
+    assert not decoder.buffer and not decoder.errors, "decoder left state behind"
+
+
+def check_corruption(rng: random.Random, payload: bytes) -> None:
+    frame = bytearray(Packet.build_from_payload(payload).get_bytes()[1:])
+    position = rng.randrange(len(frame))
+    frame[position] = (frame[position] + rng.randint(1, 255)) & 0xFF
+    try:
+        Packet.from_bytes(bytes(frame))
+    except ValueError:
+        pass
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Round-trip fuzzer for lib.packet")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+
+    for payload in CORPUS:
+        check_payload(payload)
+    check_stream(rng, CORPUS)
+
+    for i in range(args.iterations):
+        payloads = [random_payload(rng) for _ in range(rng.randint(1, 4))]
+        for payload in payloads:
+            try:
+                check_payload(payload)
+                check_corruption(rng, payload)
+            except Exception:
+                print(f"Failed on iteration {i} (seed {args.seed}): {payload[:64]!r}")
+                raise
+        check_stream(rng, payloads)
+
+    print(f"OK: {len(CORPUS)} corpus entries, {args.iterations} random iterations (seed {args.seed})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,114 @@
+"""Micro-benchmark for the Packet escape/unescape/checksum codec.
+
+Compares the bulk codec in lib.packet against the original byte-by-byte
+implementation on realistic POST config payloads and checks that both
+produce identical frames.
+
+    python benchmarks/packet_bench.py
+"""
+import json
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from lib.packet import Packet
+
+
+class LegacyCodec():
+    MAGIC = 0x5A
+    ESCAPE = 0x5B
+    ESCAPED_MAGIC = 0x01
+    ESCAPED_ESCAPE = 0x02
+
+    def checksum(self, data: bytes):
+        s = 0
+        for b in data:
+            s = (s + b) & 0xFF
+        return bytes([s])
+
+    def escape(self, data: bytes):
+        out = bytearray()
+        for b in data:
+            if b == self.MAGIC:
+                out += bytes([self.ESCAPE, self.ESCAPED_MAGIC])
+            elif b == self.ESCAPE:
+                out += bytes([self.ESCAPE, self.ESCAPED_ESCAPE])
+            else:
+                out.append(b)
+        return bytes(out)
+
+    def unescape(self, data: bytes):
+        out = bytearray()
+        i = 0
+        while i < len(data):
+            b = data[i]
+            if b == self.ESCAPE:
+                i += 1
+                b2 = data[i]
+                if b2 == self.ESCAPED_MAGIC:
+                    out.append(self.MAGIC)
+                elif b2 == self.ESCAPED_ESCAPE:
+                    out.append(self.ESCAPE)
+                else:
+                    raise ValueError("Invalid escape sequence")
+            else:
+                out.append(b)
+            i += 1
+        return bytes(out)
+
+
+def config_payload(size: int) -> bytes:
+    # a multi-entry playlist config padded to roughly `size` bytes; media names
+    # contain 'Z' (0x5A) and '[' (0x5B) so the escape paths are exercised
+    media = []
+    config = {}
+    while True:
+        config = {
+            "temperature": "Celsius",
+            "waterBlockScreen": {
+                "enable": True,
+                "displayInSleep": True,
+                "brightness": 200,
+                "id": {"id": "Customization", "screenMode": "Full Screen", "playMode": "Single", "media": media},
+            },
+        }
+        encoded = json.dumps(config, separators=(',', ':')).encode('utf-8')
+        if len(encoded) >= size:
+            return encoded
+        media.append(f"RYUO_IV_ZZ[{len(media):04d}]_{random.randint(0, 10**6)}.mp4")
+
+
+def bench(label: str, func, number: int) -> float:
+    elapsed = min(timeit.repeat(func, number=number, repeat=5))
+    return elapsed / number * 1e6
+
+
+def main():
+    random.seed(0)
+    legacy = LegacyCodec()
+    packet = Packet()
+
+    print(f"{'payload':>8} {'op':>9} {'legacy us':>11} {'bulk us':>9} {'speed-up':>9}")
+    for size in (1024, 2048, 4096, 8192):
+        payload = config_payload(size)
+        escaped = legacy.escape(payload)
+
+        assert packet.escape(payload) == escaped
+        assert packet.unescape(escaped) == payload
+        assert packet.checksum(payload) == legacy.checksum(payload)
+
+        for op, old, new, arg in (
+            ("escape", legacy.escape, packet.escape, payload),
+            ("unescape", legacy.unescape, packet.unescape, escaped),
+            ("checksum", legacy.checksum, packet.checksum, payload),
+        ):
+            old_us = bench(op, lambda: old(arg), 200)
+            new_us = bench(op, lambda: new(arg), 2000)
+            print(f"{len(payload):>8} {op:>9} {old_us:>11.1f} {new_us:>9.2f} {old_us / new_us:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Benchmark suite for lib.packet framing and unframing.
+
+Times the Packet builders, parser, codec and streaming decoder over escape-dense,
+telemetry and config payloads and compares the results with a stored baseline.
+
+    python benchmarks/protocol_bench.py                  # compare with baseline
+    python benchmarks/protocol_bench.py --check          # exit 1 on regression
+    python benchmarks/protocol_bench.py --save-baseline  # record a new baseline
+
+Timings are machine specific: record a baseline on the machine you compare on.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+from lib.packet import Packet, PacketDecoder
+
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+
+def telemetry_json() -> str:
+    # shape of System.get_system_data
+    data = {
+        "network": {"upload": 1520, "download": 48211},
+        "memory": {"total": 31906, "used": 9120, "load": 28, "temperature": 0, "speed": 2266},
+        "cpu": {"load": 12, "temperature": 47, "temperaturePackage": 0, "speedAverage": 3412, "power": 9, "voltage": 0.886, "usage": 12},
+        "gpu": {"hasDedicated": True, "load": 5, "temperature": 40, "fan": 0, "speed": 892, "power": 18, "voltage": 0.745},
+        "disk": {"total": 931, "used": 402, "load": 43, "activity": 3, "temperature": 0, "readSpeed": 1024, "writeSpeed": 90},
+        "fans": [{"onBoard": True, "name": f"System {i}", "value": 600 + i * 91} for i in range(5)],
+        "motherboard": {"temperature": 32, "chipsetTemperature": 44},
+        "timestamp": 1760000000000,
+    }
+    return json.dumps(data, separators=(',', ':'))
+
+
+def config_json(entries: int) -> str:
+    # shape of HIDDevice.update_display with a multi-entry playlist
+    data = {
+        "temperature": "Celsius",
+        "waterBlockScreen": {
+            "enable": True,
+            "displayInSleep": True,
+            "brightness": 200,
+            "id": {
+                "id": "Customization",
+                "screenMode": "Full Screen",
+                "playMode": "Single",
+                "media": [f"2025-10-{i % 28 + 1:02d}_12-00-00-{i:03d}.mp4" for i in range(entries)],
+                "settings": {"titleColor": "#E5252B", "contentColor": "#FFFFFF", "filter": {"value": None, "opacity": 100}, "badges": []},
+                "sysinfoDisplay": ["CPU Temperature", "GPU Temperature", "CPU Usage", "Date&Time", "GPU Usage", "Motherboard Temperature"],
+                "timeZone": "Europe/Rome",
+            },
+        },
+        "spec": {"cpu": "Custom PC", "gpu": "Custom GPU"},
+    }
+    return json.dumps(data, separators=(',', ':'))
+
+
+def dense_json(size: int) -> str:
+    # 'Z' is MAGIC (0x5A) and '[' is ESCAPE (0x5B): every byte needs escaping
+    rng = random.Random(size)
+    return ''.join(rng.choice('Z[') for _ in range(size))
+
+
+def cases():
+    return {
+        "dense-1k": ("STATE all", dense_json(1024)),
+        "dense-8k": ("POST config", dense_json(8192)),
+        "telemetry": ("STATE all", telemetry_json()),
+        "config-1": ("POST config", config_json(1)),
+        "config-200": ("POST config", config_json(200)),
+    }
+
+
+def operations(packet_method: str, json_str: str):
+    packet = Packet.build_from_string(packet_method, json_str, 1)
+    payload = packet.PAYLOAD
+    frame = bytes(packet.get_bytes())
+    framed = frame[1:]
+    escaped = framed[1:-1]
+    codec = Packet()
+
+    def decode_stream():
+        decoder = PacketDecoder()
+        for offset in range(0, len(frame), 64):
+            decoder.feed(frame[offset:offset + 64])
+
+    return {
+        "build_from_string": lambda: Packet.build_from_string(packet_method, json_str, 1),
+        "build_from_payload": lambda: Packet.build_from_payload(payload),
+        "from_bytes": lambda: Packet.from_bytes(framed),
+        "escape": lambda: codec.escape(payload),
+        "unescape": lambda: codec.unescape(escaped),
+        "decoder_64b_chunks": decode_stream,
+    }
+
+
+def measure(func) -> float:
+    # best-of-7 microseconds per call, with the loop count autoscaled to ~50 ms
+    number, _ = timeit.Timer(func).autorange()
+    number = max(1, number // 4)
+    return min(timeit.repeat(func, number=number, repeat=7)) / number * 1e6
+
+
+def run() -> dict:
+    results = {}
+    for case, (packet_method, json_str) in cases().items():
+        for op, func in operations(packet_method, json_str).items():
+            results[f"{case}/{op}"] = measure(func)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark lib.packet framing")
+    parser.add_argument("--save-baseline", action="store_true", help="store results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 if any result regresses")
+    parser.add_argument("--tolerance", type=float, default=2.0, help="allowed slowdown factor vs baseline (default 2.0)")
+    args = parser.parse_args(argv)
+
+    results = run()
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+
+    regressions = []
+    print(f"{'benchmark':<34} {'us/call':>10} {'baseline':>10} {'ratio':>7}")
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base:
+            ratio = value / base
+            flag = "  REGRESSION" if ratio > args.tolerance else ""
+            if flag:
+                regressions.append(name)
+            print(f"{name:<34} {value:>10.2f} {base:>10.2f} {ratio:>6.2f}x{flag}")
+        else:
+            print(f"{name:<34} {value:>10.2f} {'-':>10} {'-':>7}")
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({name: round(value, 3) for name, value in results.items()}, f, indent=4)
+        print(f"Baseline written to {BASELINE_PATH}")
+
+    if args.check and regressions:
+        print(f"{len(regressions)} benchmark(s) slower than {args.tolerance}x baseline")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,221 @@
+import collections
+import os
+import socket
+import stat
+import struct
+import time
+
+
+FileEntry = collections.namedtuple("FileEntry", "name mode size mtime")
+
+
+class SyncConnection():
+    """A device's sync: service: LIST, STAT, SEND and RECV over one socket.
+
+    Every sync request and reply is a 4-byte id followed by a little-endian
+    32-bit length (or fixed-size fields, depending on the id).
+    """
+    MAX_CHUNK = 64 * 1024
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+
+    def close(self):
+        try:
+            self.sock.sendall(b"QUIT" + struct.pack("<I", 0))
+        except OSError:
+            pass
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _request(self, command: bytes, data: bytes):
+        self.sock.sendall(command + struct.pack("<I", len(data)) + data)
+
+    def _fail(self, length: int):
+        message = ADBClient.read_exact(self.sock, length).decode(errors="replace")
+        raise RuntimeError(f"adb sync failed: {message}")
+
+    def list(self, path: str) -> list:
+        self._request(b"LIST", path.encode())
+        entries = []
+        while True:
+            reply = ADBClient.read_exact(self.sock, 20)
+            ident = reply[:4]
+            if ident == b"DONE":
+                return entries
+            if ident != b"DENT":
+                raise RuntimeError(f"adb sync: unexpected LIST reply {ident!r}")
+            mode, size, mtime, length = struct.unpack("<IIII", reply[4:])
+            name = ADBClient.read_exact(self.sock, length).decode(errors="replace")
+            if name not in (".", ".."):
+                entries.append(FileEntry(name, mode, size, mtime))
+
+    def walk(self, path: str):
+        """Yield (directory, entry) for everything below path, depth first like find.
+
+        Symbolic links are reported but not followed.
+        """
+        for entry in self.list(path):
+            yield path, entry
+            if stat.S_ISDIR(entry.mode):
+                yield from self.walk(f"{path.rstrip('/')}/{entry.name}")
+
+    def stat(self, path: str) -> FileEntry:
+        """mode, size and mtime of path; mode is 0 when it does not exist."""
+        self._request(b"STAT", path.encode())
+        reply = ADBClient.read_exact(self.sock, 16)
+        if reply[:4] != b"STAT":
+            raise RuntimeError(f"adb sync: unexpected STAT reply {reply[:4]!r}")
+        mode, size, mtime = struct.unpack("<III", reply[4:])
+        return FileEntry(os.path.basename(path), mode, size, mtime)
+
+    def recv(self, path: str):
+        """Yield the contents of path chunk by chunk as the device sends them."""
+        self._request(b"RECV", path.encode())
+        while True:
+            ident, length = struct.unpack("<4sI", ADBClient.read_exact(self.sock, 8))
+            if ident == b"DATA":
+                yield ADBClient.read_exact(self.sock, length)
+            elif ident == b"DONE":
+                return
+            elif ident == b"FAIL":
+                self._fail(length)
+            else:
+                raise RuntimeError(f"adb sync: unexpected RECV reply {ident!r}")
+
+    def send(self, path: str, stream, mode: int = 0o644, mtime: int = None):
+        """Write the file-like stream to path on the device."""
+        self._request(b"SEND", f"{path},{stat.S_IFREG | mode}".encode())
+        while True:
+            chunk = stream.read(self.MAX_CHUNK)
+            if not chunk:
+                break
+            self._request(b"DATA", chunk)
+        self.sock.sendall(b"DONE" + struct.pack("<I", int(time.time() if mtime is None else mtime)))
+        ident, length = struct.unpack("<4sI", ADBClient.read_exact(self.sock, 8))
+        if ident == b"FAIL":
+            self._fail(length)
+        if ident != b"OKAY":
+            raise RuntimeError(f"adb sync: unexpected SEND reply {ident!r}")
+
+
+class ADBClient():
+    """Talks to the adb server (localhost:5037) directly instead of running the adb binary.
+
+    Host requests are a 4-hex-digit length followed by the request; the server
+    answers OKAY or FAIL plus a length-prefixed message. host:transport switches
+    the socket to the device, after which shell: and sync: services run on it.
+    """
+    DEFAULT_PORT = 5037
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, serial: str = None, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.serial = serial
+        self.timeout = timeout
+
+    @staticmethod
+    def read_exact(sock: socket.socket, length: int) -> bytes:
+        data = bytearray()
+        while len(data) < length:
+            chunk = sock.recv(length - len(data))
+            if not chunk:
+                raise ConnectionError("adb server closed the connection")
+            data += chunk
+        return bytes(data)
+
+    def _connect(self) -> socket.socket:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def _request(self, sock: socket.socket, request: str):
+        data = request.encode()
+        sock.sendall(b"%04x" % len(data) + data)
+        status = self.read_exact(sock, 4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            length = int(self.read_exact(sock, 4), 16)
+            raise RuntimeError(f"adb: {self.read_exact(sock, length).decode(errors='replace')}")
+        raise RuntimeError(f"adb: unexpected reply {status!r} to {request}")
+
+    def _read_reply(self, sock: socket.socket) -> str:
+        length = int(self.read_exact(sock, 4), 16)
+        return self.read_exact(sock, length).decode(errors="replace")
+
+    def _transport(self, service: str) -> socket.socket:
+        sock = self._connect()
+        try:
+            self._request(sock, f"host:transport:{self.serial}" if self.serial else "host:transport-any")
+            self._request(sock, service)
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    def available(self) -> bool:
+        try:
+            self.version()
+            return True
+        except (OSError, RuntimeError):
+            return False
+
+    def version(self) -> int:
+        with self._connect() as sock:
+            self._request(sock, "host:version")
+            return int(self._read_reply(sock), 16)
+
+    def devices(self) -> list:
+        """(serial, state) of every device the server knows."""
+        with self._connect() as sock:
+            self._request(sock, "host:devices")
+            reply = self._read_reply(sock)
+        return [tuple(line.split("\t", 1)) for line in reply.splitlines() if "\t" in line]
+
+    def shell(self, command: str) -> str:
+        """Output of command run by the device shell (stdout and stderr interleaved)."""
+        with self._transport(f"shell:{command}") as sock:
+            output = bytearray()
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                output += chunk
+        return output.decode(errors="replace")
+
+    def sync(self) -> SyncConnection:
+        return SyncConnection(self._transport("sync:"))
+
+    def list(self, path: str) -> list:
+        with self.sync() as sync:
+            return sync.list(path)
+
+    def walk(self, path: str) -> list:
+        with self.sync() as sync:
+            return list(sync.walk(path))
+
+    def stat(self, path: str) -> FileEntry:
+        with self.sync() as sync:
+            return sync.stat(path)
+
+    def pull(self, remote_path: str, local_path: str):
+        with self.sync() as sync:
+            try:
+                with open(local_path, "wb") as f:
+                    for chunk in sync.recv(remote_path):
+                        f.write(chunk)
+            except Exception:
+                # do not leave a truncated file behind
+                if os.path.exists(local_path):
+                    os.remove(local_path)
+                raise
+
+    def push(self, local_path: str, remote_path: str, mode: int = 0o644):
+        with self.sync() as sync, open(local_path, "rb") as f:
+            sync.send(remote_path, f, mode, int(os.path.getmtime(local_path)))
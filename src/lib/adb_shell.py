@@ -0,0 +1,120 @@
+import queue
+import subprocess
+import threading
+import time
+import uuid
+
+
+class ADBShell():
+    """One long-lived `adb shell` that runs commands back to back over its stdin.
+
+    Each command is followed by a printf of a per-session sentinel and the exit
+    code, so the output of a command ends where the sentinel line starts. A
+    session that died, broke its pipe or timed out is killed and a fresh one is
+    started by the next command. A command is only sent again when it never
+    reached the session; once written it runs at most once.
+    """
+
+    def __init__(self, adb_path: str = "adb"):
+        self.adb_path = adb_path
+        self.process = None
+        self.lines = None
+        self.lock = threading.Lock()
+        self.sentinel = f"__RYUO_{uuid.uuid4().hex}__"
+        self.started = False
+        self.restarts = 0
+
+    def start(self):
+        if self.started:
+            self.restarts += 1
+        self.started = True
+        self.process = subprocess.Popen(
+            [self.adb_path, "shell"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self.lines = queue.Queue()
+        threading.Thread(target=self._reader, args=(self.process.stdout, self.lines), daemon=True).start()
+
+    @staticmethod
+    def _reader(stream, lines: queue.Queue):
+        for line in iter(stream.readline, b""):
+            lines.put(line)
+        lines.put(None)
+
+    def close(self):
+        process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    def _kill(self):
+        if self.process is not None:
+            self.process.kill()
+            self.process.wait()
+            self.process = None
+
+    def run(self, command: str, timeout: float = 10) -> subprocess.CompletedProcess:
+        """Run command on the device; stdout and stderr are returned together in stdout."""
+        with self.lock:
+            if self.process is None or self.process.poll() is not None:
+                self.start()
+            try:
+                self._send(command)
+            except BrokenPipeError:
+                # the session was dead before the command reached it: safe to send it again
+                self._kill()
+                self.start()
+                try:
+                    self._send(command)
+                except BrokenPipeError as e:
+                    self._kill()
+                    raise RuntimeError("adb shell session could not be started") from e
+            try:
+                return self._receive(command, timeout)
+            except EOFError as e:
+                # the command may already have run, never send it twice
+                self._kill()
+                raise RuntimeError("adb shell session closed unexpectedly") from e
+            except subprocess.TimeoutExpired:
+                # the command may still be running and would desync the next reply
+                self._kill()
+                raise
+
+    def _send(self, command: str):
+        # printf expands $? before it runs, so it reports the command's exit code
+        script = f"{{ {command}\n}} </dev/null 2>&1; printf '\\n{self.sentinel} %d\\n' $?\n"
+        self.process.stdin.write(script.encode())
+        self.process.stdin.flush()
+
+    def _receive(self, command: str, timeout: float) -> subprocess.CompletedProcess:
+        marker = self.sentinel.encode()
+        deadline = time.monotonic() + timeout
+        output = []
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(command, timeout)
+            try:
+                line = self.lines.get(timeout=remaining)
+            except queue.Empty:
+                raise subprocess.TimeoutExpired(command, timeout)
+            if line is None:
+                raise EOFError("adb shell closed")
+            if line.startswith(marker):
+                returncode = int(line[len(marker):].strip() or 0)
+                break
+            output.append(line)
+
+        # drop the newline printf put in front of the sentinel
+        stdout = b"".join(output)[:-1].decode(errors="replace").replace("\r\n", "\n")
+        return subprocess.CompletedProcess(command, returncode, stdout, "")
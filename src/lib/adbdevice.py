@@ -1,6 +1,10 @@
 from datetime import datetime
 import subprocess
+import shlex
+import stat
 import os
+from .adb_client import ADBClient
+from .adb_shell import ADBShell
 
 class ADBDevice():
     ADB_PATH = "adb"  # Assumes adb is in PATH
@@ -8,6 +12,9 @@ class ADBDevice():
     SYSTEM_FILE_PATH = "/sdcard/pcMediaPreset"
 
     def __init__(self):
+        self.shell = ADBShell(self.ADB_PATH)
+        # talks to the adb server started by the shell session; the binary is the fallback
+        self.client = ADBClient()
         self.check_adb_availability()
         self.check_android_app_running()
 
@@ -17,34 +24,41 @@ class ADBDevice():
             raise EnvironmentError("ADB not found or not working properly.")
         
     def check_android_app_running(self):
-        cmd = [self.ADB_PATH, "shell", "pidof com.baiyi.homeui.hshomeui"]
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
-        
-        if not result.stdout.strip():
+        result = self.shell.run("pidof com.baiyi.homeui.hshomeui", timeout=5)
+
+        # stderr comes back in stdout, so error text alone must not pass the check
+        if result.returncode != 0 or not result.stdout.strip():
             raise RuntimeError("Target Android app is not running.")
 
+    def list_mp4_files(self, path):
+        """Names of the mp4 files under path; raises when the device could not be listed.
+
+        Same set as find <path> -type f -name '*.mp4': subdirectories included,
+        links not followed. An empty list means there are none.
+        """
+        try:
+            return [
+                entry.name for _, entry in self.client.walk(path)
+                if stat.S_ISREG(entry.mode) and entry.name.endswith(".mp4")
+            ]
+        except (OSError, RuntimeError):
+            pass
+
+        result = self.shell.run(f"find {path} -type f -name '*.mp4' 2>/dev/null", timeout=30)
+        # find also exits non-zero for an unreadable subdirectory; keep what it did list
+        if result.returncode != 0 and not result.stdout.strip():
+            raise RuntimeError(f"listing {path} failed with exit code {result.returncode}")
+        files = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
+        return [os.path.basename(f) for f in files]
+
     def get_mp4_files(self):
         try:
-            user_files = []
-            preset_files = []
-            
             # User directory mp4 list (/sdcard/pcMedia)
-            cmd = [self.ADB_PATH, "shell", f"find {self.USER_FILE_PATH} -type f -name '*.mp4' 2>/dev/null"]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            
-            if result.returncode == 0 and result.stdout.strip():
-                files = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
-                user_files = [os.path.basename(f) for f in files]
-            
+            user_files = self.list_mp4_files(self.USER_FILE_PATH)
+
             # Preset directory mp4 list (/sdcard/pcMediaPreset - read-only)
-            preset_path = "/sdcard/pcMediaPreset"
-            cmd = [self.ADB_PATH, "shell", f"find {self.SYSTEM_FILE_PATH} -type f -name '*.mp4' 2>/dev/null"]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            
-            if result.returncode == 0 and result.stdout.strip():
-                files = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
-                preset_files = [os.path.basename(f) for f in files]
-            
+            preset_files = self.list_mp4_files(self.SYSTEM_FILE_PATH)
+
             return user_files, preset_files
         
         except subprocess.TimeoutExpired:
@@ -65,6 +79,12 @@ class ADBDevice():
                 remote_filename = now.strftime("%Y-%m-%d_%H-%M-%S-") + f"{now.microsecond // 1000:03d}.mp4"
             
             remote_path = f"{self.USER_FILE_PATH}/{remote_filename}"
+
+            try:
+                self.client.push(local_path, remote_path)
+                return remote_filename
+            except (OSError, RuntimeError) as e:
+                print(f"adb server push failed ({e}), retrying with adb push")
             
             cmd = [self.ADB_PATH, "push", local_path, remote_path]
             result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
@@ -81,9 +101,9 @@ class ADBDevice():
             print(f"Error: {e}")
             return None
             
-    def download_media(self, media_file, local_path):
-        # download media from user or preset directory
-        user_files, preset_files = self.get_mp4_files()
+    def download_media(self, media_file, local_path, media_files=None):
+        # download media from user or preset directory; media_files is a known (user, preset) listing
+        user_files, preset_files = media_files if media_files is not None else self.get_mp4_files()
 
         if media_file in user_files:
             remote_path = f"{self.USER_FILE_PATH}/{media_file}"
@@ -94,6 +114,12 @@ class ADBDevice():
             return False
         
         try:
+            try:
+                self.client.pull(remote_path, local_path)
+                return True
+            except (OSError, RuntimeError) as e:
+                print(f"adb server pull failed ({e}), retrying with adb pull")
+
             cmd = [self.ADB_PATH, "pull", remote_path, local_path]
             result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
             
@@ -108,9 +134,9 @@ class ADBDevice():
         except Exception as e:
             raise e
         
-    def delete_media(self, media_file):
+    def delete_media(self, media_file, media_files=None):
         # Only user files can be deleted, preset files are read-only
-        user_files, preset_files = self.get_mp4_files()
+        user_files, preset_files = media_files if media_files is not None else self.get_mp4_files()
         
         if not user_files:
             print("No user media files found to delete.")
@@ -124,8 +150,7 @@ class ADBDevice():
         remote_path = f"{self.USER_FILE_PATH}/{media_file}"
             
         try:
-            cmd = [self.ADB_PATH, "shell", f"rm {remote_path}"]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            result = self.shell.run(f"rm {shlex.quote(remote_path)}", timeout=10)
             
             if result.returncode == 0:
                 return True
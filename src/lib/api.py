@@ -1,6 +1,7 @@
 from .ryuo import Ryuo
 from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks
 from fastapi.responses import JSONResponse, FileResponse
+from starlette.concurrency import run_in_threadpool
 import uvicorn
 import shutil
 import os
@@ -11,10 +12,16 @@ import tempfile
 def make_app(ryuo: Ryuo) -> FastAPI:
     app = FastAPI(title="Ryuo API")
 
+    @app.middleware("http")
+    async def track_activity(request, call_next):
+        # someone is using the daemon: leave the idle keepalive/telemetry intervals
+        ryuo.notify_activity()
+        return await call_next(request)
+
     @app.get("/list")
-    def list_media():
+    def list_media(refresh: bool = False):
         try:
-            media = ryuo.get_media_files()
+            media = ryuo.get_media_files(refresh)
             return JSONResponse(content={"media": media})
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
@@ -27,8 +34,26 @@ def make_app(ryuo: Ryuo) -> FastAPI:
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    @app.get("/stats")
+    def stats():
+        try:
+            return JSONResponse(content={"stats": ryuo.get_stats()})
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    @app.get("/telemetry/history")
+    def telemetry_history(tier: str = "1m", metrics: str | None = None):
+        try:
+            names = [m for m in metrics.split(",") if m] if metrics else None
+            return JSONResponse(content={"history": ryuo.get_telemetry_history(tier, names)})
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"Unknown history tier: {tier}")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    # a plain def: the copy and the adb push run in the threadpool, not on the loop
     @app.post("/upload")
-    async def upload(file: UploadFile = File(...)):
+    def upload(file: UploadFile = File(...)):
         if not file.filename.lower().endswith(".mp4"):
             raise HTTPException(status_code=400, detail="Only .mp4 files are supported")
         # save to a temporary path then invoke upload
@@ -53,8 +78,7 @@ def make_app(ryuo: Ryuo) -> FastAPI:
     @app.delete("/delete/{media}")
     def delete_media(media: str):
         try:
-            media_files = ryuo.get_media_files()
-            if media not in media_files:
+            if not ryuo.has_media_file(media):
                 raise HTTPException(status_code=404, detail="Media not found")
             ryuo.delete(media)
             # if it was active, clear
@@ -70,7 +94,7 @@ def make_app(ryuo: Ryuo) -> FastAPI:
             raise HTTPException(status_code=500, detail=str(e))
 
     @app.post("/set/{media}/{brightness}")
-    def set_media_brightness(media: str, brightness: int):
+    async def set_media_brightness(media: str, brightness: int):
         try:
             try:
                 brightness = int(brightness)
@@ -79,16 +103,11 @@ def make_app(ryuo: Ryuo) -> FastAPI:
             if brightness < 0 or brightness > 255:
                 raise HTTPException(status_code=400, detail="Brightness must be between 0 and 255")
 
-            media_files = ryuo.get_media_files()
-            if media not in media_files:
+            # a catalog miss lists the device over adb, the HID round-trips are awaited on the loop
+            if not await run_in_threadpool(ryuo.has_media_file, media):
                 raise HTTPException(status_code=404, detail="Media not found on device")
 
-            ryuo.set_media(media)
-            ryuo.set_brightness(brightness)
-            try:
-                ryuo.config.save_config()
-            except Exception:
-                pass
+            await ryuo.set_display_async(media, brightness)
             return JSONResponse(content={"media": media, "brightness": brightness})
         except HTTPException:
             raise
@@ -96,7 +115,7 @@ def make_app(ryuo: Ryuo) -> FastAPI:
             raise HTTPException(status_code=500, detail=str(e))
 
     @app.post("/brightness/{brightness}")
-    def set_brightness_only(brightness: int):
+    async def set_brightness_only(brightness: int):
         try:
             try:
                 brightness = int(brightness)
@@ -106,11 +125,7 @@ def make_app(ryuo: Ryuo) -> FastAPI:
                 raise HTTPException(status_code=400, detail="Brightness must be between 0 and 255")
 
             # apply brightness to current media only
-            ryuo.set_brightness(brightness)
-            try:
-                ryuo.config.save_config()
-            except Exception:
-                pass
+            await ryuo.set_brightness_async(brightness)
             return JSONResponse(content={"brightness": brightness})
         except HTTPException:
             raise
@@ -120,8 +135,7 @@ def make_app(ryuo: Ryuo) -> FastAPI:
     @app.get("/download/{media}")
     def download_media(media: str, background_tasks: BackgroundTasks):
         try:
-            media_files = ryuo.get_media_files()
-            if media not in media_files:
+            if not ryuo.has_media_file(media):
                 raise HTTPException(status_code=404, detail="Media not found")
 
             tmp_dir = os.path.join(os.getcwd(), "tmp_downloads")
@@ -158,4 +172,7 @@ class API:
 
     def run(self):
         # run uvicorn programmatically
-        uvicorn.run(self.app, host=self.host, port=self.port)
\ No newline at end of file
+        try:
+            uvicorn.run(self.app, host=self.host, port=self.port)
+        finally:
+            self.ryuo.close()
\ No newline at end of file
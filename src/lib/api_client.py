@@ -44,8 +44,8 @@ class APIClient:
     def is_running(self) -> bool:
         return self._port_open()
 
-    def get_media_files(self):
-        r = requests.get(f"{self.base}/list")
+    def get_media_files(self, refresh: bool = False):
+        r = requests.get(f"{self.base}/list", params={"refresh": "true"} if refresh else None)
         r.raise_for_status()
         return r.json().get("media", [])
 
@@ -54,6 +54,14 @@ class APIClient:
         r.raise_for_status()
         return r.json().get("config", {})
 
+    def get_telemetry_history(self, tier: str = "1m", metrics: list | None = None):
+        params = {"tier": tier}
+        if metrics:
+            params["metrics"] = ",".join(metrics)
+        r = requests.get(f"{self.base}/telemetry/history", params=params)
+        r.raise_for_status()
+        return r.json().get("history", {})
+
     def upload(self, path: str):
         with open(path, "rb") as fh:
             files = {"file": (path.split(os.sep)[-1], fh, "video/mp4")}
@@ -5,4 +5,7 @@ class App():
         self.ryuo = Ryuo()
 
     def run(self):
-        input()
+        try:
+            input()
+        finally:
+            self.ryuo.close()
@@ -0,0 +1,52 @@
+import asyncio
+import json
+from concurrent.futures import Future
+from .hiddevice import HIDDevice
+from .scheduler import IOScheduler
+from .system import System
+
+
+class AsyncHIDDevice():
+    """asyncio front end for HIDDevice.
+
+    Requests go through the same IOScheduler and ResponseDispatcher threads as the
+    blocking API, so the device keeps a single owner; coroutines await the reply
+    Future on the event loop instead of parking a threadpool worker on it.
+    """
+
+    def __init__(self, hid_device: HIDDevice):
+        self.device = hid_device
+
+    async def wait(self, future: Future, timeout: float):
+        # asyncio.wait rather than wait_for: a request cancelled by a failed write
+        # must read as "no reply" without being mistaken for cancelling this task
+        wrapped = asyncio.wrap_future(future)
+        done, _ = await asyncio.wait((wrapped,), timeout=timeout)
+        if not done:
+            future.cancel()
+            return None
+        if wrapped.cancelled():
+            return None
+        return wrapped.result()
+
+    async def send(self, packet_method: str, json_payload: str = "", priority: int = IOScheduler.TELEMETRY):
+        """Queue a packet that expects no reply, at any priority, and wait until it has been written."""
+        future = self.device.scheduler.submit(priority, packet_method, json_payload, expect_reply=False)
+        return await self.wait(future, self.device.RESPONSE_TIMEOUT)
+
+    async def request(self, packet_method: str, json_payload: str = "", priority: int = IOScheduler.CONFIG, timeout: float = HIDDevice.RESPONSE_TIMEOUT):
+        return await self.wait(self.device.scheduler.submit(priority, packet_method, json_payload), timeout)
+
+    async def send_keepalive(self):
+        return await self.request("POST conn", priority=IOScheduler.KEEPALIVE, timeout=self.device.keepalive_interval)
+
+    async def send_system_state(self):
+        system_data = await asyncio.get_running_loop().run_in_executor(None, System.get_system_data)
+        if not system_data:
+            return False
+        await self.send("STATE all", json.dumps(system_data, separators=(',', ':')))
+        return True
+
+    async def update_display(self, media_files, brightness=200):
+        json_payload = self.device.build_display_config(media_files, brightness)
+        return await self.wait(self.device.post_config(json_payload), self.device.RESPONSE_TIMEOUT)
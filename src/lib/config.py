@@ -1,3 +1,6 @@
+import copy
+from .display_config import DisplayConfig
+
 class Config():
     def __init__(self, file_path, adb_device=None):
         self.file_path = file_path or "config.json"
@@ -5,18 +8,29 @@ class Config():
         self.settings = {}
         self.load_config()
 
-    def default_config(self):
+    def default_media(self):
         media = 'RYUO_IV_HW_Info_01.mp4'
         if self.adb_device:
             user_media_files, system_media_files = self.adb_device.get_mp4_files()
             if system_media_files:
                 media = system_media_files[0]
+        return media
 
+    def default_config(self):
         return {
             "brightness": 200,
-            "media": media,
             "keepalive_interval": 1,
-            "send_system_data": True
+            "send_system_data": True,
+            "telemetry_max_interval": 10,
+            "keepalive_max_interval": 2,
+            "idle_telemetry_interval": 30,
+            "idle_load": 10,
+            "idle_after": 30,
+            "media_cache_ttl": 300,
+            "telemetry_thresholds": {},
+            "network_interfaces": [],
+            "disks": [],
+            "display": copy.deepcopy(DisplayConfig.DEFAULTS)
         }
     
     def load_config(self):
@@ -33,6 +47,9 @@ class Config():
             self.settings = default_settings
 
         self.settings = {**default_settings, **self.settings}
+        # only ask the device for a preset when no media was configured
+        if "media" not in self.settings:
+            self.settings["media"] = self.default_media()
 
         self.save_config()
 
@@ -0,0 +1,78 @@
+import threading
+import time
+from concurrent.futures import Future
+from .response import Response
+
+
+class ResponseDispatcher(threading.Thread):
+    """Drains the HID device continuously and hands each reply to the request it answers.
+
+    Requests register a Future under their SeqNumber before they are written; replies
+    are matched on the SeqNumber in their header. A reply without a SeqNumber answers
+    the oldest outstanding request.
+    """
+    MAX_PENDING = 64
+
+    def __init__(self, hid_device, poll_timeout: int = 100):
+        super().__init__()
+        self.device = hid_device
+        self.poll_timeout = poll_timeout
+        self.running = True
+        self.daemon = True
+        # insertion ordered: the first entry is the oldest outstanding request
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.unsolicited = 0
+
+    def expect(self, sequence_number: int, future: Future = None) -> Future:
+        if future is None:
+            future = Future()
+        with self.lock:
+            # drop requests whose waiter already gave up
+            while self.pending and self.pending[next(iter(self.pending))].cancelled():
+                del self.pending[next(iter(self.pending))]
+            self.pending[sequence_number] = future
+            while len(self.pending) > self.MAX_PENDING:
+                self.pending.pop(next(iter(self.pending))).cancel()
+        return future
+
+    def discard(self, sequence_number: int):
+        with self.lock:
+            self.pending.pop(sequence_number, None)
+
+    def dispatch(self, response: Response):
+        sequence_number = response.sequence_number
+        with self.lock:
+            if sequence_number is not None:
+                future = self.pending.pop(sequence_number, None)
+            elif self.pending:
+                future = self.pending.pop(next(iter(self.pending)))
+            else:
+                future = None
+
+        if future is None or not future.set_running_or_notify_cancel():
+            self.unsolicited += 1
+            return
+        future.set_result(response)
+
+    def run(self):
+        while self.running:
+            try:
+                self.device.close_retired()
+                if not self.device.connected:
+                    time.sleep(self.poll_timeout / 1000)
+                    continue
+                for packet in self.device.read_packets(timeout=self.poll_timeout):
+                    self.dispatch(Response(packet))
+            except Exception as e:
+                print(f"[Dispatcher] Error: {e}")
+                time.sleep(self.poll_timeout / 1000)
+
+        with self.lock:
+            for future in self.pending.values():
+                future.cancel()
+            self.pending.clear()
+        print("[Dispatcher Thread] Terminated")
+
+    def stop(self):
+        self.running = False
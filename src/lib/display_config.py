@@ -0,0 +1,92 @@
+import copy
+import json
+
+
+class DisplayConfig():
+    """POST config payload serialised once, with brightness and media patched in per call.
+
+    The static blocks (temperature unit, sleep behaviour, theme settings, sysinfo
+    overlay, time zone, spec) come from the "display" section of the settings and
+    are merged over DEFAULTS, nested blocks key by key.
+    """
+    DEFAULTS = {
+        "temperature": "Celsius",
+        "displayInSleep": True,
+        "screenMode": "Full Screen",
+        "playMode": "Single",
+        "settings": {
+            "titleColor": "#E5252B",
+            "contentColor": "#FFFFFF",
+            "filter": {
+                "value": None,
+                "opacity": 100
+            },
+            "badges": []
+        },
+        "sysinfoDisplay": [
+            "CPU Temperature",
+            "GPU Temperature",
+            "CPU Usage",
+            "Date&Time",
+            "GPU Usage",
+            "Motherboard Temperature"
+        ],
+        "timeZone": "Europe/Rome",
+        "spec": {
+            "cpu": "Custom PC",
+            "gpu": "Custom GPU"
+        }
+    }
+
+    _BRIGHTNESS = "__ryuo_brightness__"
+    _MEDIA = "__ryuo_media__"
+
+    def __init__(self, settings: dict = None):
+        self.settings = self.merge(self.DEFAULTS, settings or {})
+        # (media list, its JSON) swapped in one assignment: render() runs on several threads
+        self._media = (None, None)
+
+        template = json.dumps(self.to_dict(self._MEDIA, self._BRIGHTNESS), separators=(',', ':'))
+        self._head, rest = template.split(json.dumps(self._BRIGHTNESS), 1)
+        self._middle, self._tail = rest.split(json.dumps(self._MEDIA), 1)
+
+    @classmethod
+    def merge(cls, defaults: dict, overrides: dict) -> dict:
+        """defaults updated with overrides, nested dicts merged key by key."""
+        merged = copy.deepcopy(defaults)
+        for key, value in overrides.items():
+            if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                merged[key] = cls.merge(merged[key], value)
+            else:
+                merged[key] = copy.deepcopy(value)
+        return merged
+
+    def to_dict(self, media_files, brightness) -> dict:
+        s = self.settings
+        return {
+            "temperature": s["temperature"],
+            "waterBlockScreen": {
+                "enable": True,
+                "displayInSleep": s["displayInSleep"],
+                "brightness": brightness,
+                "id": {
+                    "id": "Customization",
+                    "screenMode": s["screenMode"],
+                    "playMode": s["playMode"],
+                    "media": media_files,
+                    "settings": s["settings"],
+                    "sysinfoDisplay": s["sysinfoDisplay"],
+                    "timeZone": s["timeZone"]
+                }
+            },
+            "spec": s["spec"]
+        }
+
+    def render(self, media_files, brightness) -> str:
+        media, media_json = self._media
+        if media_files != media:
+            media = list(media_files)
+            media_json = json.dumps(media, separators=(',', ':'))
+            self._media = (media, media_json)
+        brightness_json = str(brightness) if type(brightness) is int else json.dumps(brightness)
+        return self._head + brightness_json + self._middle + media_json + self._tail
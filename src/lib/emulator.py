@@ -0,0 +1,140 @@
+import heapq
+import json
+import random
+import threading
+import time
+from .packet import Packet, PacketDecoder
+from .response import ResponseHeader
+
+
+class EmulatedDevice():
+    """Software Ryuo IV speaking the Packet framing, usable in place of hid.device.
+
+    POST conn and POST config are answered with a reply carrying the request's
+    SeqNumber after latency +/- jitter seconds; STATE all is accepted silently,
+    like the real display. Each request is dropped with probability drop_rate.
+    Replies are handed out in reads of at most `size` bytes, so long replies span
+    several reports.
+    """
+
+    def __init__(self, latency: float = 0.002, jitter: float = 0.0, drop_rate: float = 0.0, report_size: int = 1024, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.report_size = report_size
+        self.random = random.Random(seed)
+        self.decoder = PacketDecoder()
+        self.condition = threading.Condition()
+        # (due time, order, frame) heap of replies not yet visible to read()
+        self.scheduled = []
+        self._order = 0
+        self.outbox = bytearray()
+        self.is_open = False
+        self.plugged = True
+        self.config = None
+        self.telemetry = None
+        self.received = {}
+        self.dropped = 0
+
+    # hid.device interface
+
+    def open(self, vendor_id=None, product_id=None, serial_number=None):
+        if not self.plugged:
+            raise IOError("open failed")
+        self.is_open = True
+
+    def close(self):
+        self.is_open = False
+
+    def set_nonblocking(self, value):
+        return 0
+
+    def write(self, data) -> int:
+        self._check()
+        data = bytes(data)
+        # first byte is the report id, not part of the frame
+        for packet in self.decoder.feed(data[1:]):
+            self._handle(packet)
+        return len(data)
+
+    def read(self, max_length: int, timeout_ms: int = 0):
+        deadline = None if timeout_ms < 0 else time.monotonic() + timeout_ms / 1000
+        with self.condition:
+            while True:
+                self._check()
+                self._release_due()
+                if self.outbox:
+                    chunk = bytes(self.outbox[:max_length])
+                    del self.outbox[:max_length]
+                    return list(chunk)
+
+                now = time.monotonic()
+                wake = self.scheduled[0][0] if self.scheduled else None
+                if deadline is not None:
+                    if now >= deadline:
+                        return []
+                    wake = deadline if wake is None else min(wake, deadline)
+                self.condition.wait(None if wake is None else max(0.0, wake - now))
+
+    # hotplug simulation
+
+    def unplug(self):
+        with self.condition:
+            self.plugged = False
+            self.is_open = False
+            self.condition.notify_all()
+
+    def plug(self):
+        with self.condition:
+            self.plugged = True
+            self.condition.notify_all()
+
+    # protocol
+
+    def _check(self):
+        if not self.plugged or not self.is_open:
+            raise IOError("device not available")
+
+    def _handle(self, packet: Packet):
+        header = ResponseHeader(packet.get_payload_header())
+        packet_method = header.start_line.rsplit(' ', 1)[0]
+        self.received[packet_method] = self.received.get(packet_method, 0) + 1
+
+        if self.drop_rate and self.random.random() < self.drop_rate:
+            self.dropped += 1
+            return
+
+        body = bytes(packet.get_payload_body())
+        if packet_method == "STATE all":
+            self.telemetry = body
+            return
+        if packet_method == "POST config":
+            self.config = json.loads(body) if body else None
+
+        reply = Packet.build_from_string(packet_method, '{"code":200}', header.sequence_number or 0)
+        delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+        with self.condition:
+            self._order += 1
+            # the reply goes out without the report id, as hidapi returns it
+            heapq.heappush(self.scheduled, (time.monotonic() + delay, self._order, bytes(reply.get_bytes())[1:]))
+            self.condition.notify_all()
+
+    def _release_due(self):
+        now = time.monotonic()
+        while self.scheduled and self.scheduled[0][0] <= now:
+            self.outbox += heapq.heappop(self.scheduled)[2]
+
+
+class EmulatorBackend():
+    """Stands in for the hid module: HIDDevice(..., backend=EmulatorBackend(...))."""
+
+    def __init__(self, **device_options):
+        self.emulated = EmulatedDevice(**device_options)
+
+    def device(self) -> EmulatedDevice:
+        return self.emulated
+
+    def enumerate(self, vendor_id=0, product_id=0):
+        if not self.emulated.plugged:
+            return []
+        return [{"vendor_id": vendor_id, "product_id": product_id, "product_string": "Ryuo IV (emulated)"}]
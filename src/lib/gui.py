@@ -134,7 +134,7 @@ class GUI(QMainWindow):
 
         media_btn_layout = QHBoxLayout()
         self.refresh_btn = QPushButton("Refresh")
-        self.refresh_btn.clicked.connect(self.refresh_media_list)
+        self.refresh_btn.clicked.connect(lambda: self.refresh_media_list(refresh=True))
         self.upload_btn = QPushButton("Upload")
         self.upload_btn.clicked.connect(self.upload_media)
         self.download_btn = QPushButton("Download")
@@ -222,8 +222,9 @@ class GUI(QMainWindow):
             self.info_media_label.setText("Media: Error")
             self.info_brightness_label.setText("Brightness: Error")
 
-    def refresh_media_list(self):
-        self.run_async(self.client.get_media_files, self.on_media_list_loaded)
+    def refresh_media_list(self, refresh: bool = False):
+        # refresh=True makes the daemon list the device again instead of using its cache
+        self.run_async(self.client.get_media_files, self.on_media_list_loaded, refresh=refresh)
 
     def on_media_list_loaded(self, success: bool, result):
         self.media_list.clear()
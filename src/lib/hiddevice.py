@@ -1,96 +1,242 @@
 import hid
-import time
-from .packet import Packet
+import threading
+from concurrent.futures import Future, CancelledError, TimeoutError as FutureTimeoutError
+from .dispatcher import ResponseDispatcher
+from .scheduler import IOScheduler
+from .supervisor import ConnectionSupervisor
+from .packet import PacketDecoder, HeaderTemplate, ReportSegmenter
+from .response import ResponseHeader
+from .display_config import DisplayConfig
 from .system import System
 import json
 
 class HIDDevice():
-    def __init__(self, vendor_id: int, product_id: int, keepalive_interval: int = 1):
+    REPORT_SIZE = 1024
+    RESPONSE_TIMEOUT = 1.0
+
+    def __init__(self, vendor_id: int, product_id: int, keepalive_interval: int = 1, report_size: int = REPORT_SIZE, backend=hid, display_config: DisplayConfig = None):
+        # backend provides device() and enumerate(): the hid module, or lib.emulator.EmulatorBackend
+        self.backend = backend
         self.vendor_id = vendor_id
         self.product_id = product_id
         self.keepalive_interval = keepalive_interval
         self.sequence_number = 0
+        self.decoder = PacketDecoder()
+        self.segmenter = ReportSegmenter(report_size)
+        # one reusable output buffer per packet method
+        self.buffers = {}
+        self.display_config = display_config or DisplayConfig()
+        # last POST config payload, replayed after a reconnect
+        self.last_config = None
+        self.device = None
+        # handles replaced by a reconnect; only the reader thread closes them, between reads
+        self.retired = []
+        # held by write() and while closing handles, so no handle is closed mid-write
+        self.handle_lock = threading.Lock()
+        self.connected = False
+        # the open error of the current outage was already printed
+        self.open_failing = False
+        self.supervisor = ConnectionSupervisor(self)
         self.connect()
+        self.dispatcher = ResponseDispatcher(self)
+        self.dispatcher.start()
+        self.scheduler = IOScheduler(self)
+        self.scheduler.start()
+        self.supervisor.start()
 
-    def connect(self):
+    def connect(self, notify: bool = True):
+        """Open the device; the supervisor passes notify=False, it is already retrying."""
         try:
-            self.device = hid.device()
-            self.device.open(self.vendor_id, self.product_id)
-            return self.device
+            device = self.backend.device()
+            device.open(self.vendor_id, self.product_id)
         except Exception as e:
-            print(f"Error connecting to device VID={hex(self.vendor_id)}, PID={hex(self.product_id)}: {e}")
+            # once per outage, not once per reconnect attempt
+            if not self.open_failing:
+                print(f"Error connecting to device VID={hex(self.vendor_id)}, PID={hex(self.product_id)}: {e}")
+                self.open_failing = True
+            self.connected = False
+            if notify:
+                self.supervisor.notify(e)
+            else:
+                self.supervisor.last_error = str(e)
             return None
+
+        if self.device is not None and self.device is not device:
+            # the dispatcher may still be blocked in read() on the old handle
+            self.retired.append(self.device)
+        self.device = device
+        self.decoder.reset()
+        self.open_failing = False
+        self.connected = True
+        return self.device
+
+    def connection_lost(self, error):
+        # report once; the supervisor takes over and reconnects
+        if self.connected:
+            print(f"Device connection lost: {error}")
+            self.connected = False
+            self.supervisor.notify(error)
+
+    def close_retired(self):
+        # called by the dispatcher, the only thread that reads, never during a read
+        if not self.retired:
+            return
+        with self.handle_lock:
+            while self.retired:
+                try:
+                    self.retired.pop().close()
+                except Exception:
+                    pass
+
+    def close(self, timeout: float = 2.0):
+        """Stop the supervisor, scheduler and dispatcher threads and close the handle.
+
+        The supervisor goes first so nothing reopens the device behind our back;
+        the handle is closed only once the dispatcher no longer reads from it.
+        """
+        for thread in (self.supervisor, self.scheduler, self.dispatcher):
+            thread.stop()
+            if thread.is_alive():
+                thread.join(timeout)
+        self.connected = False
+        with self.handle_lock:
+            handles = self.retired + ([self.device] if self.device is not None else [])
+            self.retired = []
+            self.device = None
+            for handle in handles:
+                try:
+                    handle.close()
+                except Exception:
+                    pass
+
+    def replay_config(self):
+        if self.last_config is not None:
+            self.scheduler.submit(IOScheduler.CONFIG, "POST config", self.last_config)
         
     def read(self, size: int = 1024, timeout: int = 1000) -> bytes:
+        if not self.connected:
+            return bytes()
         try:
             data = self.device.read(size, timeout)
             return bytes(data)
         except Exception as e:
-            print(f"Error reading from device: {e}")
+            self.connection_lost(e)
             return bytes()
+
+    def read_packets(self, timeout: int = 1000) -> list:
+        # wait up to timeout for the first report, then drain whatever is already queued;
+        # while a frame is only partially received keep waiting for its remaining reports
+        packets = []
+        data = self.read(timeout=timeout)
+        while data:
+            packets.extend(self.decoder.feed(data))
+            data = self.read(timeout=timeout if self.decoder.buffer else 0)
+        return packets
         
     def write(self, data: bytes) -> int:
+        if not self.connected:
+            return 0
         try:
-            bytes_written = self.device.write(data)
+            # frames longer than one report go out as back-to-back report writes
+            bytes_written = 0
+            with self.handle_lock:
+                for report in self.segmenter.reports(data):
+                    bytes_written += self.device.write(report)
             self.sequence_number += 1
             return bytes_written
         except Exception as e:
-            print(f"Error writing to device: {e}")
+            self.connection_lost(e)
             return 0
         
-    def send_and_receive(self, packet: bytes) -> bytes:
+    def build_frame(self, packet_method: str, json_payload: str = "") -> bytearray:
+        buffer = self.buffers.get(packet_method)
+        if buffer is None:
+            buffer = self.buffers[packet_method] = bytearray()
+        template = HeaderTemplate.for_method(packet_method)
+        return template.build_into(buffer, json_payload.encode('utf-8'), self.sequence_number)
+
+    # submit/request touch the device and the sequence number: only the
+    # scheduler thread calls them, everything else goes through the scheduler
+    def submit(self, packet: bytes, future: Future = None, expect_reply: bool = True, sequence_number: int = None) -> Future:
+        """Write a packet built for sequence_number (default: the current one); the Future resolves to its Response."""
+        if sequence_number is None:
+            sequence_number = self.sequence_number
+        if expect_reply:
+            future = self.dispatcher.expect(sequence_number, future)
+        elif future is None:
+            future = Future()
+
+        if not self.write(packet):
+            self.dispatcher.discard(sequence_number)
+            future.cancel()
+        elif not expect_reply and future.set_running_or_notify_cancel():
+            future.set_result(None)
+        return future
+
+    def submit_frame(self, packet: bytes, future: Future = None, expect_reply: bool = True) -> Future:
+        """Write a prebuilt frame; its reply is matched on the SeqNumber the frame carries."""
+        packets = PacketDecoder().feed(bytes(packet))
+        sequence_number = ResponseHeader(packets[0].get_payload_header()).sequence_number if packets else None
+        return self.submit(packet, future, expect_reply, sequence_number)
+
+    def request(self, packet_method: str, json_payload: str = "", future: Future = None, expect_reply: bool = True) -> Future:
+        return self.submit(self.build_frame(packet_method, json_payload), future, expect_reply)
+
+    def wait(self, future: Future, timeout: float):
         try:
-            self.write(packet)
-            time.sleep(0.1)
-            response = self.read()
-            return response
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            return None
+        except CancelledError:
+            return None
+
+    def stats(self) -> dict:
+        return {
+            "connection": self.supervisor.state(),
+            "scheduler": self.scheduler.stats(),
+            "dispatcher": {
+                "pending": len(self.dispatcher.pending),
+                "unsolicited": self.dispatcher.unsolicited,
+                "decode_errors": self.decoder.errors,
+            },
+        }
+
+    def send_and_receive(self, packet: bytes, timeout: float = RESPONSE_TIMEOUT):
+        try:
+            return self.wait(self.scheduler.submit_raw(IOScheduler.CONFIG, packet), timeout)
         except Exception as e:
             print(f"Error in send_and_receive: {e}")
-            return bytes()
+            return None
         
-    def send_keepalive(self):
-        packet = Packet.build_from_string("POST conn", "", self.sequence_number).get_bytes()
-
-        try:
-            self.write(packet)
-
-            time.sleep(self.keepalive_interval)
-            
-            for attempt in range(2):
-                response = self.read()
-                
-                if response:
-                    response_bytes = bytes(response)
-                    
-                    try:
-                        parsed = Packet.from_bytes(response_bytes)
-                        return parsed
-                    except Exception as e:
-                        print(f"[Keepalive] Received response but failed to parse: {e}")
-                        print(f"[Keepalive] Raw content: {response_bytes[:100]}")
-                        return response_bytes
-                else:
-                    if attempt == 0:
-                        print(f"[Keepalive] No response on attempt {attempt + 1}, retrying...")
-            
-            print("[Keepalive] No response received, but packet sent successfully")
-            print("[Keepalive] The device may send status asynchronously")
+    def send_keepalive(self, timeout=None):
+        if timeout is None:
+            timeout = self.keepalive_interval
+        if not self.connected:
+            # the supervisor reports the outage; nothing to send until it reconnects
             return None
+        try:
+            response = self.wait(self.scheduler.submit(IOScheduler.KEEPALIVE, "POST conn"), timeout)
+            if response is None:
+                print("[Keepalive] No response received within the keepalive interval")
+            return response
             
         except Exception as e:
             print(f"[Keepalive] Error: {e}")
             return None
 
-    def send_system_state(self):
+    def send_system_state(self, system_data=None):
+        if not self.connected:
+            return False
         try:
-            system_data = System.get_system_data()
+            if system_data is None:
+                system_data = System.get_system_data()
             if not system_data:
                 return False
             
             json_payload = json.dumps(system_data, separators=(',', ':'))
 
-            packet = Packet.build_from_string("STATE all", json_payload, self.sequence_number).get_bytes()
-            self.write(packet)
+            self.scheduler.submit(IOScheduler.TELEMETRY, "STATE all", json_payload)
             return True
             
         except Exception as e:
@@ -98,44 +244,11 @@ class HIDDevice():
             return False
         
     def update_display(self, media_files, brightness=200):
-        config_data = {
-            "temperature": "Celsius",
-            "waterBlockScreen": {
-                "enable": True,
-                "displayInSleep": True,
-                "brightness": brightness,
-                "id": {
-                    "id": "Customization",
-                    "screenMode": "Full Screen",
-                    "playMode": "Single",
-                    "media": media_files,
-                    "settings": {
-                        "titleColor": "#E5252B",
-                        "contentColor": "#FFFFFF",
-                        "filter": {
-                            "value": None,
-                            "opacity": 100
-                        },
-                        "badges": []
-                    },
-                    "sysinfoDisplay": [
-                        "CPU Temperature",
-                        "GPU Temperature",
-                        "CPU Usage",
-                        "Date&Time",
-                        "GPU Usage",
-                        "Motherboard Temperature"
-                    ],
-                    "timeZone": "Europe/Rome"
-                }
-            },
-            "spec": {
-                "cpu": "Custom PC",
-                "gpu": "Custom GPU"
-            }
-        }
-        
-        json_payload = json.dumps(config_data, separators=(',', ':'))
-        packet = Packet.build_from_string("POST config", json_payload, self.sequence_number).get_bytes()
-        return self.send_and_receive(packet)
-    
\ No newline at end of file
+        return self.wait(self.post_config(self.build_display_config(media_files, brightness)), self.RESPONSE_TIMEOUT)
+
+    def post_config(self, json_payload: str) -> Future:
+        self.last_config = json_payload
+        return self.scheduler.submit(IOScheduler.CONFIG, "POST config", json_payload)
+
+    def build_display_config(self, media_files, brightness=200) -> str:
+        return self.display_config.render(media_files, brightness)
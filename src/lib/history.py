@@ -0,0 +1,143 @@
+import array
+import itertools
+import math
+import threading
+import time
+from .telemetry_filter import TelemetryFilter
+
+
+class HistoryTier():
+    """Fixed-size ring of time buckets, one float column per metric per aggregate.
+
+    A sample is folded into the bucket covering its clock reading, so the newest
+    bucket is always current; buckets nobody wrote to stay NaN. The clock is
+    time.monotonic(): a wall clock step (NTP, RTC) must not drop samples. Wall
+    time is only kept to label each bucket with its start.
+    """
+    AGGREGATES = ("avg", "min", "max")
+
+    def __init__(self, name: str, resolution: float, slots: int):
+        self.name = name
+        self.resolution = resolution
+        self.slots = slots
+        self.starts = array.array('d', [math.nan]) * slots
+        self.columns = {}
+        self.head = -1
+        self.bucket = None
+        self.sums = {}
+        self.counts = {}
+
+    def _column(self, metric: str) -> dict:
+        columns = self.columns.get(metric)
+        if columns is None:
+            columns = {aggregate: array.array('f', [math.nan]) * self.slots for aggregate in self.AGGREGATES}
+            self.columns[metric] = columns
+        return columns
+
+    def _advance(self, bucket: int, start: float):
+        # clear every slot skipped since the last sample, at most the whole ring
+        for step in range(min(bucket - self.bucket if self.bucket is not None else 1, self.slots)):
+            self.head = (self.head + 1) % self.slots
+            self.starts[self.head] = math.nan
+            for columns in self.columns.values():
+                for column in columns.values():
+                    column[self.head] = math.nan
+        self.starts[self.head] = start
+        self.bucket = bucket
+        self.sums.clear()
+        self.counts.clear()
+
+    def add(self, clock: float, values: dict, timestamp: float = None):
+        """Fold values sampled at clock (monotonic) into the ring; timestamp is the wall time of the sample."""
+        bucket = int(clock // self.resolution)
+        if self.bucket is not None and bucket < self.bucket:
+            return  # a monotonic clock never does this, only a caller passing stale clocks
+        if bucket != self.bucket:
+            if timestamp is None:
+                timestamp = clock
+            self._advance(bucket, timestamp - (clock - bucket * self.resolution))
+        head = self.head
+        for metric, value in values.items():
+            columns = self._column(metric)
+            count = self.counts.get(metric, 0) + 1
+            total = self.sums.get(metric, 0.0) + value
+            self.counts[metric] = count
+            self.sums[metric] = total
+            columns["avg"][head] = total / count
+            if count == 1:
+                columns["min"][head] = columns["max"][head] = value
+            else:
+                columns["min"][head] = min(columns["min"][head], value)
+                columns["max"][head] = max(columns["max"][head], value)
+
+    def _ordered(self, column: array.array) -> array.array:
+        start = self.head + 1
+        return column[start:] + column[:start]
+
+    def query(self, metrics: list = None) -> dict:
+        if self.bucket is None:
+            return {"tier": self.name, "resolution": self.resolution, "timestamps": [], "metrics": {}}
+        starts = self._ordered(self.starts)
+        # drop the never-written slots in front of a ring that has not wrapped yet
+        first = next((i for i, start in enumerate(starts) if start == start), len(starts))
+        result = {}
+        for metric in metrics if metrics is not None else sorted(self.columns):
+            columns = self.columns.get(metric)
+            if columns is None:
+                continue
+            avg = self._ordered(columns["avg"])[first:]
+            # empty buckets are NaN: filterfalse(math.isnan) skips them without a Python loop
+            present = array.array('f', itertools.filterfalse(math.isnan, avg))
+            result[metric] = {
+                "values": [value if value == value else None for value in avg],
+                "min": min(itertools.filterfalse(math.isnan, self._ordered(columns["min"])[first:]), default=None),
+                "max": max(itertools.filterfalse(math.isnan, self._ordered(columns["max"])[first:]), default=None),
+                "avg": math.fsum(present) / len(present) if present else None,
+            }
+        return {
+            "tier": self.name,
+            "resolution": self.resolution,
+            "timestamps": [start if start == start else None for start in starts[first:]],
+            "metrics": result,
+        }
+
+
+class TelemetryHistory():
+    """Bounded telemetry history: every sample is folded into all tiers.
+
+    Memory is fixed by the tier sizes and the number of metrics (each value is a
+    4-byte float), so it does not grow however long the daemon runs.
+    """
+    TIERS = (
+        ("1m", 1.0, 60),
+        ("1h", 15.0, 240),
+        ("24h", 300.0, 288),
+    )
+
+    def __init__(self, tiers: tuple = TIERS):
+        self.lock = threading.Lock()
+        self.tiers = {name: HistoryTier(name, resolution, slots) for name, resolution, slots in tiers}
+
+    def add(self, data: dict, timestamp: float = None, clock: float = None):
+        """Record a snapshot; clock (time.monotonic()) picks the buckets, timestamp labels them."""
+        if timestamp is None:
+            timestamp = time.time()
+        if clock is None:
+            clock = time.monotonic()
+        values = {
+            metric: value for metric, value in TelemetryFilter.flatten(data).items()
+            if type(value) in (int, float)
+        }
+        with self.lock:
+            for tier in self.tiers.values():
+                tier.add(clock, values, timestamp)
+
+    def metrics(self) -> list:
+        with self.lock:
+            return sorted(next(iter(self.tiers.values())).columns) if self.tiers else []
+
+    def query(self, tier: str = "1m", metrics: list = None) -> dict:
+        if tier not in self.tiers:
+            raise KeyError(tier)
+        with self.lock:
+            return self.tiers[tier].query(metrics)
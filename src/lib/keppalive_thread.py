@@ -1,9 +1,19 @@
-
 import threading
 import time
+from .system import System
+from .telemetry_filter import TelemetryFilter
+from .power_policy import PowerPolicy
 
 class KeepaliveThread(threading.Thread):
-    def __init__(self, hid_device, interval=1, send_system_data=True):
+    """Sends the heartbeat (and telemetry) on deadlines of time.monotonic().
+
+    Each deadline is the previous one plus the heartbeat interval the power
+    policy currently asks for, so time spent waiting for a reply does not push
+    the following ticks back. A tick that could not be served before the next
+    one was due is counted as missed and skipped rather than sent in a burst.
+    activity() while idle wakes the thread and serves a tick straight away.
+    """
+    def __init__(self, hid_device, interval=1, send_system_data=True, telemetry_filter=None, power_policy=None):
         super().__init__()
         self.device = hid_device
         self.interval = interval
@@ -11,25 +21,91 @@ class KeepaliveThread(threading.Thread):
         self.daemon = True
         self.send_system_data = send_system_data
         self.seq_number = 0
-    
+        self.telemetry_filter = telemetry_filter or TelemetryFilter()
+        self.power_policy = power_policy or PowerPolicy(interval=interval, max_interval=interval)
+        self.wakeup = threading.Event()
+        self.missed = 0
+        self.jitter_total = 0.0
+        self.jitter_max = 0.0
+        self.jitter_last = 0.0
+
     def run(self):
+        deadline = time.monotonic() + self.interval
+        last_telemetry = None
         while self.running:
             try:
-                time.sleep(self.interval)
+                self.wakeup.wait(max(0.0, deadline - time.monotonic()))
                 if not self.running:
                     break
-                
-                self.device.send_keepalive()
-                
-                if self.send_system_data:
-                    self.device.send_system_state()
-                
+
+                now = time.monotonic()
+                if self.wakeup.is_set():
+                    self.wakeup.clear()
+                    deadline = now
+                    last_telemetry = None
+
+                # sampled even without telemetry: the power policy needs the CPU load
+                system_data = System.get_system_data()
+                self.power_policy.update(system_data, now)
+                interval = self.power_policy.heartbeat_interval()
+                late = now - deadline
+                if late >= interval:
+                    skipped = int(late // interval)
+                    self.missed += skipped
+                    deadline += skipped * interval
+                    late -= skipped * interval
+                self._record_jitter(late)
+                deadline += interval
+
+                # a lost reply may use the rest of this tick, never the next one
+                self.device.send_keepalive(timeout=max(0.0, deadline - time.monotonic()))
+
+                # half a tick of slack so telemetry stays on the heartbeat grid
+                if self.send_system_data and system_data and (last_telemetry is None or
+                        now - last_telemetry >= self.power_policy.telemetry_interval() - interval / 2):
+                    last_telemetry = now
+                    if (self.telemetry_filter.should_send(system_data, now)
+                            and self.device.send_system_state(system_data)):
+                        self.telemetry_filter.mark_sent(system_data, now)
+
                 self.seq_number += 1
-                
+
             except Exception as e:
                 print(f"[Keepalive] Error: {e}")
                 break
         print("[Keepalive Thread] Terminated")
-    
+
+    def activity(self):
+        """Leave the idle intervals now, e.g. on an API request.
+
+        Only the timestamp is recorded here; the mode is evaluated by the
+        thread alone. It is woken only while idle, the one mode activity
+        leaves: while dimmed or active a request must not force a heartbeat.
+        """
+        self.power_policy.activity()
+        if self.power_policy.mode == PowerPolicy.IDLE:
+            self.wakeup.set()
+
+    def _record_jitter(self, late):
+        self.jitter_last = late
+        self.jitter_total += late
+        if late > self.jitter_max:
+            self.jitter_max = late
+
+    def stats(self):
+        ticks = self.seq_number
+        return {
+            "interval": self.interval,
+            "ticks": ticks,
+            "missed": self.missed,
+            "jitter": {
+                "avg_ms": round(self.jitter_total / ticks * 1000, 3) if ticks else 0.0,
+                "max_ms": round(self.jitter_max * 1000, 3),
+                "last_ms": round(self.jitter_last * 1000, 3),
+            },
+            "power": self.power_policy.stats(),
+        }
+
     def stop(self):
-        self.running = False
\ No newline at end of file
+        self.running = False
+        self.wakeup.set()
@@ -0,0 +1,121 @@
+import threading
+import time
+
+
+class MediaCatalog():
+    """Cached media listings of the device.
+
+    Presets live in a read-only directory and are listed once; an empty preset
+    listing is taken as a failed one and retried. User media is listed again
+    only after ttl seconds (for changes made behind the daemon's back) or after
+    refresh(); uploads and deletes that go through the daemon update the cached
+    listing themselves, so looking up a media name normally needs no adb round
+    trip.
+
+    A failed listing is never cached: the previous one stays in use and the
+    directory is listed again at most every MISS_RESCAN_INTERVAL seconds. A
+    name that is not found makes the user directory be listed once more (at
+    the same rate) before it is reported missing.
+    """
+    MISS_RESCAN_INTERVAL = 5.0
+
+    def __init__(self, adb_device, ttl: float = 300.0):
+        self.adb_device = adb_device
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.presets = None
+        self.user = None
+        self.user_listed_at = 0.0
+        self.user_failed_at = None
+        self.presets_tried_at = None
+        self.scans = 0
+
+    def _due(self, since, now: float) -> bool:
+        return since is None or now - since >= self.MISS_RESCAN_INTERVAL
+
+    def _load(self, force: bool = False):
+        # called with the lock held; concurrent callers wait for one scan
+        now = time.monotonic()
+        if force:
+            self.user_failed_at = None
+            self.presets_tried_at = None
+        if force or self.user is None or now - self.user_listed_at >= self.ttl:
+            if self._due(self.user_failed_at, now):
+                self._list_user(now)
+        if (force or self.presets is None) and self._due(self.presets_tried_at, now):
+            self._list_presets(now)
+
+    def _list_user(self, now: float):
+        self.scans += 1
+        try:
+            user = self.adb_device.list_mp4_files(self.adb_device.USER_FILE_PATH)
+        except Exception as e:
+            print(f"Error listing user media: {e}")
+            self.user_failed_at = now
+            return
+        self.user_failed_at = None
+        self.user = user
+        self.user_listed_at = time.monotonic()
+
+    def _list_presets(self, now: float):
+        self.presets_tried_at = now
+        self.scans += 1
+        try:
+            presets = self.adb_device.list_mp4_files(self.adb_device.SYSTEM_FILE_PATH)
+        except Exception as e:
+            print(f"Error listing preset media: {e}")
+            return
+        if presets or self.presets is None:
+            self.presets = presets or None
+
+    def get(self, refresh: bool = False) -> tuple:
+        """(user media, preset media) as new lists; empty while a directory was never listed."""
+        with self.lock:
+            self._load(refresh)
+            return list(self.user or []), list(self.presets or [])
+
+    def refresh(self) -> tuple:
+        return self.get(refresh=True)
+
+    def locate(self, media_file: str):
+        """Where media_file is: "user", "preset", or None when it is not on the device."""
+        with self.lock:
+            self._load()
+            location = self._locate(media_file)
+            now = time.monotonic()
+            if (location is None and now - self.user_listed_at >= self.MISS_RESCAN_INTERVAL
+                    and self._due(self.user_failed_at, now)):
+                self._list_user(now)
+                location = self._locate(media_file)
+            return location
+
+    def _locate(self, media_file: str):
+        if self.user and media_file in self.user:
+            return "user"
+        if self.presets and media_file in self.presets:
+            return "preset"
+        return None
+
+    def added(self, media_file: str):
+        with self.lock:
+            if self.user is not None and media_file not in self.user:
+                self.user.append(media_file)
+
+    def removed(self, media_file: str):
+        with self.lock:
+            if self.user is not None and media_file in self.user:
+                self.user.remove(media_file)
+
+    def invalidate(self):
+        """Drop the user listing; the next lookup lists the device again."""
+        with self.lock:
+            self.user = None
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "scans": self.scans,
+                "user": len(self.user) if self.user is not None else None,
+                "presets": len(self.presets) if self.presets is not None else None,
+                "user_age": round(time.monotonic() - self.user_listed_at, 1) if self.user is not None else None,
+            }
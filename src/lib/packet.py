@@ -1,21 +1,54 @@
 import time
 import json
 import struct
-from dataclasses import dataclass
 
-@dataclass
+_MAGIC = b'\x5A'
+_ESCAPE = b'\x5B'
+_MAGIC_SEQ = _ESCAPE + b'\x01'
+_ESCAPE_SEQ = _ESCAPE + b'\x02'
+_BYTES = tuple(bytes([i]) for i in range(256))
+_EMPTY = bytes()
+_EMPTY_LENGTH = bytes(2)
+_EMPTY_VIEW = memoryview(_EMPTY)
+
+
+def _escape(data: bytes) -> bytes:
+    # ESCAPE must be expanded first, otherwise the ESCAPE bytes introduced
+    # by the MAGIC substitution would be escaped a second time
+    return bytes(data).replace(_ESCAPE, _ESCAPE_SEQ).replace(_MAGIC, _MAGIC_SEQ)
+
+
+def _unescape(data: bytes) -> bytes:
+    data = bytes(data)
+    escapes = data.count(_ESCAPE)
+    if not escapes:
+        return data
+    if escapes != data.count(_MAGIC_SEQ) + data.count(_ESCAPE_SEQ):
+        raise ValueError("Invalid escape sequence")
+    # MAGIC_SEQ first: collapsing ESCAPE_SEQ could otherwise glue a literal
+    # ESCAPE to a following 0x01 and fake a MAGIC_SEQ
+    return data.replace(_MAGIC_SEQ, _MAGIC).replace(_ESCAPE_SEQ, _ESCAPE)
+
+
 class Packet():
-    MAGIC: bytes = b'\x5A'
-    ESCAPE: bytes = b'\x5B'
-    ESCAPED_MAGIC: bytes = b'\x01'
-    ESCAPED_ESCAPE: bytes = b'\x02'
-    RAW: bytes = bytes()
-    LENGTH: bytes = bytes([0x00, 0x00])
-    PAYLOAD: bytes = bytes()
-    CHECKSUM: bytes = bytes([0x00])
-    HID_REPORT_ID: bytes = bytes([0x00])
+    __slots__ = ('RAW', 'LENGTH', 'PAYLOAD', 'CHECKSUM', '_header', '_body')
+
+    MAGIC = _MAGIC
+    ESCAPE = _ESCAPE
+    ESCAPED_MAGIC = b'\x01'
+    ESCAPED_ESCAPE = b'\x02'
+    HID_REPORT_ID = b'\x00'
+    HEADER_SEPARATOR = b'\r\n\r\n'
+    # the LENGTH field is 16 bits wide and counts itself
+    MAX_PAYLOAD_SIZE = 0xFFFF - 2
 
     def __init__(self, raw: bytes = bytes()):
+        self.RAW = _EMPTY
+        self.LENGTH = _EMPTY_LENGTH
+        self.PAYLOAD = _EMPTY
+        self.CHECKSUM = _BYTES[0]
+        self._header = _EMPTY_VIEW
+        self._body = _EMPTY_VIEW
         if raw:
             self.parse_packet(raw)
 
@@ -31,120 +64,232 @@ class Packet():
         return packet
     
     def to_bytes(self):
-        return self.build_packet(self.PAYLOAD)
+        return self.build_packet()
         
     def checksum(self, data: bytes):
-        s = 0
-        for b in data:
-            s = (s + b) & 0xFF
-        return bytes([s])
+        return _BYTES[sum(data) & 0xFF]
 
     def escape(self, data: bytes):
-        out = bytearray()
-        for b in data:
-            if b == self.MAGIC[0]:
-                out += bytes([self.ESCAPE[0], self.ESCAPED_MAGIC[0]])
-            elif b == self.ESCAPE[0]:
-                out += bytes([self.ESCAPE[0], self.ESCAPED_ESCAPE[0]])
-            else:
-                out.append(b)
-        return bytes(out)
+        return _escape(data)
 
     def unescape(self, data: bytes):
-        out = bytearray()
-        i = 0
-        while i < len(data):
-            b = data[i]
-            if b == self.ESCAPE[0]:
-                i += 1
-                b2 = data[i]
-                if b2 == self.ESCAPED_MAGIC[0]:
-                    out.append(self.MAGIC[0])
-                elif b2 == self.ESCAPED_ESCAPE[0]:
-                    out.append(self.ESCAPE[0])
-                else:
-                    print(f"Invalid escape sequence: {b2}")
-                    raise ValueError("Invalid escape sequence")
-            else:
-                out.append(b)
-            i += 1
-        return bytes(out)
+        return _unescape(data)
 
     def parse_packet(self, raw: bytes):
         if raw[0] != self.MAGIC[0] or raw[-1] != self.MAGIC[0]:
             raise ValueError("Invalid packet framing")
         
-        unescaped = self.unescape(raw[1:-1])
-        body = unescaped[:-1]
-        received_checksum = unescaped[-1:]
-        
-        calculated_checksum = self.checksum(body)
-        
-        if received_checksum != calculated_checksum:
+        unescaped = self.unescape(memoryview(raw)[1:-1])
+        if len(unescaped) < 3:
+            raise ValueError("Packet too short")
+
+        view = memoryview(unescaped)
+        if sum(view[:-1]) & 0xFF != unescaped[-1]:
             raise ValueError("CRC mismatch")
-        
-        length = struct.unpack(">H", body[:2])[0]
-        payload = body[2:length]
+
+        length = (unescaped[0] << 8) | unescaped[1]
 
         self.RAW = raw
-        self.LENGTH = body[:2]
-        self.PAYLOAD = payload
-        self.CHECKSUM = received_checksum
+        self.LENGTH = unescaped[:2]
+        self.PAYLOAD = unescaped[2:min(length, len(unescaped) - 1)]
+        self.CHECKSUM = _BYTES[unescaped[-1]]
+        self._index_payload()
 
         return self
+
+    def _index_payload(self, header_length: int = -1):
+        # header and body are views on PAYLOAD, located once per packet
+        if header_length < 0:
+            header_length = self.PAYLOAD.find(self.HEADER_SEPARATOR)
+        view = memoryview(self.PAYLOAD)
+        if header_length < 0:
+            self._header = view
+            self._body = _EMPTY_VIEW
+        else:
+            self._header = view[:header_length]
+            self._body = view[header_length + len(self.HEADER_SEPARATOR):]
     
     @staticmethod
     def create_http_header(packet_method: str,sequence_number: int, content_length: int):
-        timestamp = int(time.time() * 1000)
-        return (
-            f"{packet_method} 1\r\n"
-            f"SeqNumber={sequence_number}\r\n"
-            f"Date={timestamp}\r\n"
-            f"ContentType=json\r\n"
-            f"ContentLength={content_length}\r\n"
-            f"\r\n"
-        )
+        return HeaderTemplate.for_method(packet_method).build(sequence_number, content_length).decode('utf-8')
     
-    def get_payload_header(self):
-        return self.PAYLOAD.split(b'\r\n\r\n', maxsplit=1)[0]
+    def get_payload_header(self) -> memoryview:
+        return self._header
     
-    def get_payload_body(self):
-        parts = self.PAYLOAD.split(b'\r\n\r\n', maxsplit=1)
-        if len(parts) > 1:
-            return parts[1]
-        return b''
+    def get_payload_body(self) -> memoryview:
+        return self._body
     
-    def build_from_dict(self, data: dict):
-        json_str = json.dumps(data)
-        return self.build_from_string(json_str)
+    @staticmethod
+    def build_from_dict(packet_method: str, data: dict, sequence_number: int = 0):
+        json_str = json.dumps(data, separators=(',', ':'))
+        return Packet.build_from_string(packet_method, json_str, sequence_number)
     
     @staticmethod
     def build_from_string(packet_method: str, json_str: str, sequence_number: int = 0):
-        packet = Packet()
-        payload = json_str.encode('utf-8')
-        header = Packet.create_http_header(packet_method, sequence_number=sequence_number, content_length=len(payload))
-        payload = header.encode('utf-8') + payload
-        packet.PAYLOAD = payload
-        packet.LENGTH = struct.pack(">H", len(payload) + 2)
-        packet.CHECKSUM = packet.checksum(packet.LENGTH + payload)
-        packet.RAW = packet.build_packet()
-        return packet
+        body = json_str.encode('utf-8')
+        header = HeaderTemplate.for_method(packet_method).build(sequence_number, len(body))
+        return Packet.build_from_payload(header + body, len(header) - len(Packet.HEADER_SEPARATOR))
     
     @staticmethod
-    def build_from_payload(payload: bytes):
+    def build_from_payload(payload: bytes, header_length: int = -1):
+        # header_length is searched for when the caller does not know it
         packet = Packet()
         packet.PAYLOAD = payload
-        packet.LENGTH = struct.pack(">H", len(payload) + 2)
-        packet.CHECKSUM = packet.checksum(packet.LENGTH + payload)
-        packet.RAW = packet.build_packet(payload)
+        packet.LENGTH = _pack_length(len(payload))
+        packet.CHECKSUM = _BYTES[(packet.LENGTH[0] + packet.LENGTH[1] + sum(payload)) & 0xFF]
+        packet.RAW = packet.build_packet()
+        packet._index_payload(header_length)
         return packet
     
     def build_packet(self):
-        body = self.LENGTH + self.PAYLOAD
-        unframed = body + self.CHECKSUM
-        escaped = self.escape(unframed)
-        framed = self.MAGIC + escaped + self.MAGIC
-        return self.HID_REPORT_ID + framed
+        parts = (self.escape(self.LENGTH), self.escape(self.PAYLOAD), self.escape(self.CHECKSUM))
+        return _write_frame(bytearray(), parts)
 
     def get_bytes(self):
-        return self.RAW
\ No newline at end of file
+        return self.RAW
+
+
+class HeaderTemplate():
+    """Request header for one packet method with the constant parts encoded once.
+
+    Only the sequence number, timestamp and content length are formatted per packet.
+    """
+    __slots__ = ('packet_method', '_format')
+
+    _cache = {}
+
+    def __init__(self, packet_method: str):
+        self.packet_method = packet_method
+        self._format = (
+            packet_method.encode('utf-8').replace(b'%', b'%%') + b" 1\r\n"
+            b"SeqNumber=%d\r\n"
+            b"Date=%d\r\n"
+            b"ContentType=json\r\n"
+            b"ContentLength=%d\r\n"
+            b"\r\n"
+        )
+
+    @classmethod
+    def for_method(cls, packet_method: str):
+        template = cls._cache.get(packet_method)
+        if template is None:
+            template = cls._cache[packet_method] = cls(packet_method)
+        return template
+
+    def build(self, sequence_number: int, content_length: int, timestamp: int = None) -> bytes:
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+        return self._format % (sequence_number, timestamp, content_length)
+
+    def build_into(self, buffer: bytearray, body: bytes, sequence_number: int, timestamp: int = None) -> bytearray:
+        """Write the complete HID frame for body into buffer, reusing its storage, and return it."""
+        header = self.build(sequence_number, len(body), timestamp)
+        length = _pack_length(len(header) + len(body))
+        checksum = _BYTES[(length[0] + length[1] + sum(header) + sum(body)) & 0xFF]
+        parts = (_escape(length), _escape(header), _escape(body), _escape(checksum))
+        return _write_frame(buffer, parts)
+
+
+def _pack_length(payload_size: int) -> bytes:
+    if payload_size > Packet.MAX_PAYLOAD_SIZE:
+        raise ValueError(f"Payload too large: {payload_size} bytes (max {Packet.MAX_PAYLOAD_SIZE})")
+    return struct.pack(">H", payload_size + 2)
+
+
+def _write_frame(frame: bytearray, parts) -> bytearray:
+    # HID_REPORT_ID + MAGIC + escaped parts + MAGIC; frame is resized in place so a
+    # buffer reused for similarly sized packets keeps its allocation
+    size = sum(map(len, parts)) + 3
+    if len(frame) > size:
+        del frame[size:]
+    elif len(frame) < size:
+        frame += bytes(size - len(frame))
+    frame[0] = Packet.HID_REPORT_ID[0]
+    frame[1] = frame[-1] = Packet.MAGIC[0]
+    position = 2
+    for part in parts:
+        frame[position:position + len(part)] = part
+        position += len(part)
+    return frame
+
+
+class ReportSegmenter():
+    """Splits an HID frame into output reports of at most report_size data bytes.
+
+    Every report is prefixed with the frame's report id. Reports are assembled in
+    one reusable buffer, so each yielded report is only valid until the next one.
+    The device-side PacketDecoder reassembles them, as frames are MAGIC-delimited.
+    """
+
+    def __init__(self, report_size: int = 1024):
+        if report_size < 1:
+            raise ValueError("report_size must be positive")
+        self.report_size = report_size
+        self.buffer = bytearray(report_size + 1)
+
+    def reports(self, frame: bytes):
+        if len(frame) <= self.report_size + 1:
+            yield frame
+            return
+
+        view = memoryview(frame)
+        report = self.buffer
+        report[0] = frame[0]
+        for offset in range(1, len(frame), self.report_size):
+            chunk = view[offset:offset + self.report_size]
+            if len(chunk) < self.report_size:
+                yield bytes(report[:1]) + chunk
+            else:
+                report[1:] = chunk
+                yield report
+
+
+class PacketDecoder():
+    # worst case frame: every byte of a 0xFFFF body + checksum escaped, plus framing
+    MAX_BUFFER_SIZE = 2 * (0xFFFF + 1) + 2
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.errors = 0
+
+    def reset(self):
+        self.buffer.clear()
+
+    def feed(self, data: bytes) -> list:
+        """Append a chunk read from the device and return every complete, valid Packet in it.
+
+        Frames are delimited by MAGIC, which never appears inside an escaped frame,
+        so anything between two frames (report ids, zero padding) is dropped. An
+        incomplete trailing frame is kept until the next call.
+        """
+        buf = self.buffer
+        buf += data
+        packets = []
+
+        start = buf.find(_MAGIC)
+        while start != -1:
+            end = buf.find(_MAGIC, start + 1)
+            if end == -1:
+                break
+            if end == start + 1:
+                # closing MAGIC of a frame we never saw the start of
+                start = end
+                continue
+            try:
+                packets.append(Packet().parse_packet(bytes(buf[start:end + 1])))
+                start = buf.find(_MAGIC, end + 1)
+            except (ValueError, struct.error):
+                # resync: the MAGIC we took as closing may be the next opening
+                self.errors += 1
+                start = end
+
+        if start == -1:
+            buf.clear()
+        else:
+            del buf[:start]
+
+        if len(buf) > self.MAX_BUFFER_SIZE:
+            self.errors += 1
+            buf.clear()
+
+        return packets
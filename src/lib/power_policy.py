@@ -0,0 +1,98 @@
+import glob
+import os
+import time
+
+
+class PowerPolicy():
+    """Picks heartbeat and telemetry intervals from host load, brightness and API activity.
+
+    active: heartbeat every interval, telemetry on every heartbeat.
+    idle:   CPU load stayed below idle_load and nothing used the API for
+            idle_after seconds; the heartbeat stretches to max_interval (the
+            slowest the device tolerates) and telemetry to idle_telemetry_interval.
+    dimmed: brightness is 0, or displayInSleep is off and the host's monitors
+            are asleep, so the panel is dark too; heartbeat at max_interval and
+            telemetry at dimmed_telemetry_interval.
+    Load above idle_load or any activity() switches back to active at once.
+    """
+    ACTIVE = "active"
+    IDLE = "idle"
+    DIMMED = "dimmed"
+
+    def __init__(self, interval: float = 1.0, max_interval: float = 2.0, idle_telemetry_interval: float = 30.0,
+                 dimmed_telemetry_interval: float = 60.0, idle_load: int = 10, idle_after: float = 30.0,
+                 brightness: int = None, display_in_sleep: bool = True, display_asleep=None):
+        self.interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.idle_telemetry_interval = idle_telemetry_interval
+        self.dimmed_telemetry_interval = dimmed_telemetry_interval
+        self.idle_load = idle_load
+        self.idle_after = idle_after
+        self.brightness = brightness
+        self.display_in_sleep = display_in_sleep
+        self.display_asleep = display_asleep or self.host_display_asleep
+        self.mode = self.ACTIVE
+        self.transitions = 0
+        self.last_busy = self.last_activity = time.monotonic()
+
+    def activity(self, now: float = None):
+        self.last_activity = time.monotonic() if now is None else now
+
+    def set_brightness(self, brightness: int):
+        self.brightness = brightness
+
+    @staticmethod
+    def host_display_asleep() -> bool:
+        """True when every connected monitor is in DPMS standby, suspend or off.
+
+        The device does not report whether its panel sleeps, so the host's
+        monitors are the only sleep state the daemon can see. Without KMS
+        connectors (no /sys/class/drm, headless host) they count as awake.
+        """
+        states = []
+        for connector in glob.glob("/sys/class/drm/card*-*"):
+            try:
+                with open(os.path.join(connector, "status")) as f:
+                    if f.read().strip() != "connected":
+                        continue
+                with open(os.path.join(connector, "dpms")) as f:
+                    states.append(f.read().strip())
+            except OSError:
+                continue
+        return bool(states) and all(state != "On" for state in states)
+
+    def update(self, system_data: dict = None, now: float = None) -> str:
+        if now is None:
+            now = time.monotonic()
+        load = (system_data or {}).get("cpu", {}).get("load")
+        if load is not None and load >= self.idle_load:
+            self.last_busy = now
+
+        if self.brightness == 0 or (not self.display_in_sleep and self.display_asleep()):
+            mode = self.DIMMED
+        elif now - max(self.last_busy, self.last_activity) >= self.idle_after:
+            mode = self.IDLE
+        else:
+            mode = self.ACTIVE
+        if mode != self.mode:
+            self.mode = mode
+            self.transitions += 1
+        return mode
+
+    def heartbeat_interval(self) -> float:
+        return self.interval if self.mode == self.ACTIVE else self.max_interval
+
+    def telemetry_interval(self) -> float:
+        if self.mode == self.DIMMED:
+            return self.dimmed_telemetry_interval
+        if self.mode == self.IDLE:
+            return self.idle_telemetry_interval
+        return self.interval
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "transitions": self.transitions,
+            "heartbeat_interval": self.heartbeat_interval(),
+            "telemetry_interval": self.telemetry_interval(),
+        }
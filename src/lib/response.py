@@ -0,0 +1,77 @@
+import json
+from .packet import Packet
+
+
+class ResponseHeader():
+    __slots__ = ('start_line', 'sequence_number', 'date', 'content_type', 'content_length', 'fields')
+
+    def __init__(self, header: bytes):
+        lines = bytes(header).decode('utf-8', errors='replace').split('\r\n')
+        self.start_line = lines[0]
+        self.fields = {}
+        for line in lines[1:]:
+            key, sep, value = line.partition('=')
+            if sep:
+                self.fields[key] = value
+
+        self.sequence_number = self._int_field('SeqNumber')
+        self.date = self._int_field('Date')
+        self.content_length = self._int_field('ContentLength')
+        self.content_type = self.fields.get('ContentType')
+
+    def _int_field(self, key: str):
+        try:
+            return int(self.fields[key])
+        except (KeyError, ValueError):
+            return None
+
+
+class Response():
+    """Device reply wrapping a parsed Packet.
+
+    The header is parsed on first access and the JSON body is decoded only when
+    json() is called, so replies nobody inspects cost nothing beyond framing.
+    """
+    __slots__ = ('packet', '_header', '_json')
+
+    _UNDECODED = object()
+
+    def __init__(self, packet: Packet):
+        self.packet = packet
+        self._header = None
+        self._json = self._UNDECODED
+
+    @property
+    def header(self) -> ResponseHeader:
+        if self._header is None:
+            self._header = ResponseHeader(self.packet.get_payload_header())
+        return self._header
+
+    @property
+    def start_line(self) -> str:
+        return self.header.start_line
+
+    @property
+    def sequence_number(self):
+        return self.header.sequence_number
+
+    @property
+    def date(self):
+        return self.header.date
+
+    @property
+    def content_length(self):
+        return self.header.content_length
+
+    @property
+    def body(self) -> memoryview:
+        return self.packet.get_payload_body()
+
+    def json(self):
+        if self._json is self._UNDECODED:
+            body = bytes(self.body)
+            self._json = json.loads(body) if body.strip() else None
+        return self._json
+
+    def get_bytes(self):
+        return self.packet.get_bytes()
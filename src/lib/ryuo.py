@@ -1,7 +1,15 @@
+import asyncio
+import threading
 from .hiddevice import HIDDevice
+from .async_hiddevice import AsyncHIDDevice
 from .adbdevice import ADBDevice
 from .keppalive_thread import KeepaliveThread
 from .config import Config
+from .display_config import DisplayConfig
+from .system import System
+from .telemetry_filter import TelemetryFilter
+from .power_policy import PowerPolicy
+from .media_catalog import MediaCatalog
 
 class Ryuo():
     VENDOR_ID = 0x1C75
@@ -10,45 +18,167 @@ class Ryuo():
     def __init__(self):
         self.adb_device = ADBDevice()
         self.config = Config("config.json", self.adb_device)
-        self.hid_device = HIDDevice(self.VENDOR_ID, self.PRODUCT_ID)
+        self.media_catalog = MediaCatalog(self.adb_device, ttl=self.config.settings.get("media_cache_ttl", 300))
+        System.configure(
+            nics=self.config.settings.get("network_interfaces"),
+            disks=self.config.settings.get("disks")
+        )
+        self.hid_device = HIDDevice(
+            self.VENDOR_ID,
+            self.PRODUCT_ID,
+            display_config=DisplayConfig(self.config.settings.get("display"))
+        )
+        self.async_hid_device = AsyncHIDDevice(self.hid_device)
+        # (media, brightness) last acknowledged by the device
+        self.display_state = None
+        self.display_lock = threading.Lock()
+        self.display_stats = {"sent": 0, "suppressed": 0, "unacknowledged": 0}
         self.keepalive_thread = KeepaliveThread(
             self.hid_device,
             interval=self.config.settings.get("keepalive_interval", 1),
-            send_system_data=self.config.settings.get("send_system_data", True)
+            send_system_data=self.config.settings.get("send_system_data", True),
+            telemetry_filter=TelemetryFilter(
+                max_interval=self.config.settings.get("telemetry_max_interval", 10),
+                thresholds=self.config.settings.get("telemetry_thresholds")
+            ),
+            power_policy=PowerPolicy(
+                interval=self.config.settings.get("keepalive_interval", 1),
+                max_interval=self.config.settings.get("keepalive_max_interval", 2),
+                idle_telemetry_interval=self.config.settings.get("idle_telemetry_interval", 30),
+                idle_load=self.config.settings.get("idle_load", 10),
+                idle_after=self.config.settings.get("idle_after", 30),
+                brightness=self.config.settings.get("brightness"),
+                display_in_sleep=self.hid_device.display_config.settings["displayInSleep"]
+            )
         )
         self.keepalive_thread.start()
         self.apply()
 
     def apply(self):
-        self.hid_device.update_display([self.config.settings.get("media")], brightness=self.config.settings["brightness"])
+        state = self._claim_display(force=True)
+        response = self.hid_device.update_display([state[0]], brightness=state[1])
+        self._settle_display(state, response)
+
+    def close(self):
+        self.keepalive_thread.stop()
+        self.keepalive_thread.join(2.0)
+        self.hid_device.close()
+
+    def notify_activity(self):
+        self.keepalive_thread.activity()
 
     def upload(self, media_file):
-        self.adb_device.upload_media(media_file)
+        remote_filename = self.adb_device.upload_media(media_file)
+        if remote_filename:
+            self.media_catalog.added(remote_filename)
+        else:
+            self.media_catalog.invalidate()
+        return remote_filename
 
     def delete(self, media_file):
-        self.adb_device.delete_media(media_file)
+        deleted = self.adb_device.delete_media(media_file, self.media_catalog.get())
+        if deleted:
+            self.media_catalog.removed(media_file)
+        else:
+            self.media_catalog.invalidate()
+        return deleted
 
     def download(self, media_file, local_path):
-        self.adb_device.download_media(media_file, local_path)
+        return self.adb_device.download_media(media_file, local_path, self.media_catalog.get())
+
+    def set_display(self, media_file=None, brightness=None):
+        """Apply media and/or brightness with at most one POST config, none if nothing changed."""
+        self._update_settings(media_file, brightness)
+        state = self._claim_display()
+        if state is None:
+            return None
+        response = self.hid_device.update_display([state[0]], brightness=state[1])
+        self._settle_display(state, response)
+        return response
+
+    async def set_display_async(self, media_file=None, brightness=None):
+        if self._apply_settings(media_file, brightness):
+            # keep the file write off the event loop
+            await asyncio.get_running_loop().run_in_executor(None, self.config.save_config)
+        state = self._claim_display()
+        if state is None:
+            return None
+        response = await self.async_hid_device.update_display([state[0]], brightness=state[1])
+        self._settle_display(state, response)
+        return response
 
     def set_brightness(self, brightness):
-        self.config.settings["brightness"] = brightness
-        self.hid_device.update_display([self.config.settings.get("media")], brightness=self.config.settings["brightness"])
-        self.config.save_config()
+        return self.set_display(brightness=brightness)
 
     def set_media(self, media_file):
-        self.config.settings["media"] = media_file
-        self.hid_device.update_display([self.config.settings.get("media")], brightness=self.config.settings["brightness"])
-        self.config.save_config()
+        return self.set_display(media_file=media_file)
+
+    async def set_brightness_async(self, brightness):
+        return await self.set_display_async(brightness=brightness)
+
+    async def set_media_async(self, media_file):
+        return await self.set_display_async(media_file=media_file)
+
+    def _update_settings(self, media_file, brightness):
+        if self._apply_settings(media_file, brightness):
+            self.config.save_config()
+
+    def _apply_settings(self, media_file, brightness):
+        # updates the in-memory settings; returns whether they need saving
+        changed = False
+        if media_file is not None and media_file != self.config.settings.get("media"):
+            self.config.settings["media"] = media_file
+            changed = True
+        if brightness is not None and brightness != self.config.settings.get("brightness"):
+            self.config.settings["brightness"] = brightness
+            self.keepalive_thread.power_policy.set_brightness(brightness)
+            changed = True
+        return changed
+
+    def _claim_display(self, force=False):
+        # returns the (media, brightness) to send, or None when the device already shows it;
+        # the state is claimed before sending so concurrent identical requests are suppressed too
+        state = (self.config.settings.get("media"), self.config.settings["brightness"])
+        with self.display_lock:
+            if not force and state == self.display_state:
+                self.display_stats["suppressed"] += 1
+                return None
+            self.display_state = state
+            self.display_stats["sent"] += 1
+        return state
+
+    def _settle_display(self, state, response):
+        # without an acknowledgement the device state is unknown: let the next request through
+        if response is None:
+            with self.display_lock:
+                if self.display_state == state:
+                    self.display_state = None
+                self.display_stats["unacknowledged"] += 1
+
+    def get_stats(self):
+        stats = self.hid_device.stats()
+        with self.display_lock:
+            stats["display"] = dict(self.display_stats)
+        stats["telemetry"] = System.get_sampler().stats()
+        stats["state"] = self.keepalive_thread.telemetry_filter.stats()
+        stats["keepalive"] = self.keepalive_thread.stats()
+        stats["media"] = self.media_catalog.stats()
+        return stats
+
+    def get_telemetry_history(self, tier="1m", metrics=None):
+        return System.get_sampler().history.query(tier, metrics)
 
     def get_user_media_files(self):
-        user_files, _ = self.adb_device.get_mp4_files()
+        user_files, _ = self.media_catalog.get()
         return user_files
     
     def get_system_media_files(self):
-        _, system_files = self.adb_device.get_mp4_files()
+        _, system_files = self.media_catalog.get()
         return system_files
     
-    def get_media_files(self):
-        user_files, system_files = self.adb_device.get_mp4_files()
-        return user_files + system_files
\ No newline at end of file
+    def get_media_files(self, refresh=False):
+        user_files, system_files = self.media_catalog.get(refresh)
+        return user_files + system_files
+
+    def has_media_file(self, media_file):
+        return self.media_catalog.locate(media_file) is not None
\ No newline at end of file
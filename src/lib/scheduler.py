@@ -0,0 +1,107 @@
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class IOScheduler(threading.Thread):
+    """Single owner of HID writes and of the sequence number.
+
+    Commands are queued by priority: keepalives always go first so the heartbeat
+    cannot be starved, user POST config requests pre-empt STATE all telemetry.
+    Each command's Future resolves to the device Response, or to None once
+    written when no reply is expected (telemetry, unless expect_reply says
+    otherwise); it is cancelled when the write fails.
+    """
+    KEEPALIVE = 0
+    CONFIG = 1
+    TELEMETRY = 2
+    PRIORITY_NAMES = {KEEPALIVE: "keepalive", CONFIG: "config", TELEMETRY: "telemetry"}
+
+    _STOP = -1
+
+    def __init__(self, hid_device):
+        super().__init__()
+        self.device = hid_device
+        self.daemon = True
+        self.running = True
+        self.queue = queue.PriorityQueue()
+        self._order = itertools.count()
+        self.lock = threading.Lock()
+        self.wait_stats = {
+            name: {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0}
+            for name in self.PRIORITY_NAMES.values()
+        }
+
+    def submit(self, priority: int, packet_method: str, json_payload: str = "", expect_reply: bool = None) -> Future:
+        """Queue a command; expect_reply defaults to every priority but TELEMETRY."""
+        return self._put(priority, packet_method, json_payload, expect_reply)
+
+    def submit_raw(self, priority: int, packet: bytes, expect_reply: bool = None) -> Future:
+        # a prebuilt frame, its reply is matched on the SeqNumber inside it
+        return self._put(priority, None, packet, expect_reply)
+
+    def _put(self, priority: int, packet_method, payload, expect_reply) -> Future:
+        if expect_reply is None:
+            # telemetry is fire-and-forget, its future resolves once written
+            expect_reply = priority != self.TELEMETRY
+        future = Future()
+        self.queue.put((priority, next(self._order), time.monotonic(), packet_method, payload, expect_reply, future))
+        return future
+
+    def depth(self) -> int:
+        return self.queue.qsize()
+
+    def stats(self) -> dict:
+        with self.lock:
+            waits = {
+                name: {
+                    "count": s["count"],
+                    "avg_ms": round(s["total"] / s["count"] * 1000, 3) if s["count"] else 0.0,
+                    "max_ms": round(s["max"] * 1000, 3),
+                    "last_ms": round(s["last"] * 1000, 3),
+                }
+                for name, s in self.wait_stats.items()
+            }
+        return {"queue_depth": self.depth(), "wait": waits}
+
+    def _record_wait(self, priority: int, waited: float):
+        with self.lock:
+            s = self.wait_stats[self.PRIORITY_NAMES[priority]]
+            s["count"] += 1
+            s["total"] += waited
+            s["last"] = waited
+            if waited > s["max"]:
+                s["max"] = waited
+
+    def run(self):
+        while self.running:
+            priority, _, enqueued_at, packet_method, payload, expect_reply, future = self.queue.get()
+            if priority == self._STOP:
+                break
+            if future.cancelled():
+                continue
+            self._record_wait(priority, time.monotonic() - enqueued_at)
+            try:
+                if packet_method is None:
+                    self.device.submit_frame(payload, future, expect_reply)
+                else:
+                    self.device.request(packet_method, payload, future, expect_reply)
+            except Exception as e:
+                print(f"[Scheduler] Error: {e}")
+                future.cancel()
+
+        # fail whatever is still queued so no caller waits for its full timeout
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[-1] is not None:
+                item[-1].cancel()
+        print("[Scheduler Thread] Terminated")
+
+    def stop(self):
+        self.running = False
+        self.queue.put((self._STOP, next(self._order), 0.0, None, None, None, None))
@@ -0,0 +1,170 @@
+import glob
+import os
+
+
+class SensorFile():
+    """An open sysfs attribute re-read in place with os.pread."""
+    __slots__ = ('path', 'fd', 'scale')
+
+    def __init__(self, path: str, scale: float = 1.0):
+        self.path = path
+        self.scale = scale
+        self.fd = os.open(path, os.O_RDONLY)
+
+    def read(self):
+        # sysfs regenerates an attribute on every read at offset 0
+        try:
+            return int(os.pread(self.fd, 32, 0)) * self.scale
+        except (OSError, ValueError):
+            return None
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class HwmonSensors():
+    """CPU, GPU, fan and motherboard sensors discovered once under /sys/class/hwmon.
+
+    The GPU load (gpu_busy_percent) is not a hwmon attribute; it is reached
+    through the amdgpu hwmon's device link.
+
+    Every attribute stays open for the life of the daemon, so a refresh costs one
+    pread per value instead of a walk of the hwmon tree.
+    """
+    CPU_DRIVERS = ("coretemp", "k10temp", "zenpower", "cpu_thermal")
+    GPU_DRIVERS = ("amdgpu",)
+    MOTHERBOARD_LABELS = ("systin", "motherboard", "system", "mb")
+    CHIPSET_LABELS = ("pch", "chipset")
+    PACKAGE_LABELS = ("package id 0", "tctl", "tdie")
+
+    def __init__(self, root: str = "/sys"):
+        self.root = root
+        self.cpu_temperature = None
+        self.cpu_package = None
+        self.motherboard = None
+        self.chipset = None
+        self.gpu = {}
+        self.fans = []
+        self.discover()
+
+    def discover(self):
+        for hwmon in sorted(glob.glob(os.path.join(self.root, "class", "hwmon", "hwmon*"))):
+            name = self._read_text(os.path.join(hwmon, "name"))
+            if name in self.CPU_DRIVERS:
+                self._discover_cpu(hwmon)
+            elif name in self.GPU_DRIVERS:
+                if not self.gpu:
+                    self._discover_gpu(hwmon)
+            else:
+                self._discover_board(hwmon)
+
+    def _discover_cpu(self, hwmon: str):
+        for label, path in self._inputs(hwmon, "temp"):
+            if self.cpu_package is None and label.lower() in self.PACKAGE_LABELS:
+                self.cpu_package = self._open(path, 0.001)
+        if self.cpu_temperature is None:
+            first = os.path.join(hwmon, "temp1_input")
+            if os.path.exists(first):
+                self.cpu_temperature = self._open(first, 0.001)
+            elif self.cpu_package is not None:
+                self.cpu_temperature = self.cpu_package
+
+    def _discover_gpu(self, hwmon: str):
+        device = os.path.join(hwmon, "device")
+        for field, attribute, scale in (
+            ("temperature", "temp1_input", 0.001),
+            ("fan", "fan1_input", 1),
+            ("power", "power1_average", 0.000001),
+            ("voltage", "in0_input", 0.001),
+            ("speed", "freq1_input", 0.000001),
+        ):
+            path = os.path.join(hwmon, attribute)
+            if os.path.exists(path):
+                self.gpu[field] = self._open(path, scale)
+        busy = os.path.join(device, "gpu_busy_percent")
+        if os.path.exists(busy):
+            self.gpu["load"] = self._open(busy)
+
+    def _discover_board(self, hwmon: str):
+        for label, path in self._inputs(hwmon, "temp"):
+            lower = label.lower()
+            if self.motherboard is None and any(lower.startswith(l) for l in self.MOTHERBOARD_LABELS):
+                self.motherboard = self._open(path, 0.001)
+            elif self.chipset is None and any(lower.startswith(l) for l in self.CHIPSET_LABELS):
+                self.chipset = self._open(path, 0.001)
+        for label, path in self._inputs(hwmon, "fan"):
+            sensor = self._open(path)
+            if sensor is not None:
+                self.fans.append((label, sensor))
+
+    def _inputs(self, hwmon: str, kind: str):
+        for path in sorted(glob.glob(os.path.join(hwmon, f"{kind}*_input"))):
+            index = os.path.basename(path)[len(kind):-len("_input")]
+            label = self._read_text(os.path.join(hwmon, f"{kind}{index}_label")) or f"{kind}{index}"
+            yield label, path
+
+    def _open(self, path: str, scale: float = 1.0):
+        try:
+            return SensorFile(path, scale)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _read_text(path: str):
+        try:
+            with open(path) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def read(self) -> dict:
+        """Current readings as STATE all section updates; sensors that were not found are left out."""
+        updates = {}
+        cpu = {}
+        if self.cpu_temperature is not None:
+            value = self.cpu_temperature.read()
+            if value is not None:
+                cpu["temperature"] = int(value)
+        if self.cpu_package is not None:
+            value = self.cpu_package.read()
+            if value is not None:
+                cpu["temperaturePackage"] = int(value)
+        if cpu:
+            updates["cpu"] = cpu
+
+        gpu = {}
+        for field, sensor in self.gpu.items():
+            value = sensor.read()
+            if value is not None:
+                gpu[field] = round(value, 3) if field in ("power", "voltage") else int(value)
+        if gpu:
+            gpu["hasDedicated"] = True
+            updates["gpu"] = gpu
+
+        board = {}
+        if self.motherboard is not None:
+            value = self.motherboard.read()
+            if value is not None:
+                board["temperature"] = int(value)
+        if self.chipset is not None:
+            value = self.chipset.read()
+            if value is not None:
+                board["chipsetTemperature"] = int(value)
+        if board:
+            updates["motherboard"] = board
+
+        if self.fans:
+            updates["fans"] = [
+                {"onBoard": True, "name": label, "value": int(value or 0)}
+                for label, value in ((label, sensor.read()) for label, sensor in self.fans)
+            ]
+        return updates
+
+    def close(self):
+        sensors = [self.cpu_temperature, self.cpu_package, self.motherboard, self.chipset]
+        sensors += list(self.gpu.values()) + [sensor for _, sensor in self.fans]
+        for sensor in set(s for s in sensors if s is not None):
+            sensor.close()
@@ -0,0 +1,72 @@
+import threading
+import time
+
+
+class ConnectionSupervisor(threading.Thread):
+    """Reopens the HID device after it is unplugged or re-enumerates.
+
+    HIDDevice reports a lost connection through notify(); the supervisor then polls
+    the backend's enumerate (hid.enumerate) for the device with exponential backoff, reopens it and replays
+    the last display configuration.
+    """
+    MIN_BACKOFF = 0.05
+    MAX_BACKOFF = 1.0
+
+    def __init__(self, hid_device):
+        super().__init__()
+        self.device = hid_device
+        self.daemon = True
+        self.running = True
+        self.wakeup = threading.Event()
+        self.reconnects = 0
+        self.attempts = 0
+        self.last_error = None
+        self.state_since = time.time()
+
+    def notify(self, error=None):
+        self.last_error = str(error) if error else self.last_error
+        self.state_since = time.time()
+        self.wakeup.set()
+
+    def state(self) -> dict:
+        return {
+            "connected": self.device.connected,
+            "since": int(self.state_since * 1000),
+            "reconnects": self.reconnects,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+        }
+
+    def device_present(self) -> bool:
+        try:
+            return bool(self.device.backend.enumerate(self.device.vendor_id, self.device.product_id))
+        except Exception:
+            return False
+
+    def run(self):
+        backoff = self.MIN_BACKOFF
+        while self.running:
+            if self.device.connected:
+                backoff = self.MIN_BACKOFF
+                self.wakeup.wait(1.0)
+                self.wakeup.clear()
+                continue
+
+            self.attempts += 1
+            # connect() must not notify(): that would set wakeup and skip the backoff
+            if self.device_present() and self.device.connect(notify=False):
+                self.reconnects += 1
+                self.state_since = time.time()
+                print(f"[Supervisor] Device reconnected after {self.attempts} attempt(s)")
+                self.attempts = 0
+                self.device.replay_config()
+                continue
+
+            self.wakeup.wait(backoff)
+            self.wakeup.clear()
+            backoff = min(backoff * 2, self.MAX_BACKOFF)
+        print("[Supervisor Thread] Terminated")
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
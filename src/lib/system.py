@@ -1,91 +1,425 @@
+import abc
+import copy
+import math
+import os
 import psutil
+import threading
 import time
+from .history import TelemetryHistory
+from .sensors import HwmonSensors
+
+
+class Collector(abc.ABC):
+    """One telemetry source refreshed on its own schedule.
+
+    collect() returns {section: {field: value}} updates merged into the shared
+    STATE all cache (a list value replaces the section). interval is the wanted
+    refresh period in seconds, budget the time one collect() may take: a
+    collector that overruns its budget OVERRUN_STREAK times in a row is
+    refreshed less often, up to MAX_SLOWDOWN times its interval, and speeds
+    up again with every collect() that stays within budget.
+    """
+    name = "collector"
+    interval = 1.0
+    budget = 0.005
+    MAX_SLOWDOWN = 8
+    OVERRUN_STREAK = 3
+
+    def __init__(self, interval: float = None, budget: float = None):
+        if interval is not None:
+            self.interval = interval
+        if budget is not None:
+            self.budget = budget
+        self.slowdown = 1
+        self.last_cost = 0.0
+        self.overruns = 0
+        self.overrun_streak = 0
+        self.errors = 0
+
+    @abc.abstractmethod
+    def collect(self) -> dict:
+        pass
+
+    def effective_interval(self) -> float:
+        return self.interval * self.slowdown
+
+    def record_cost(self, cost: float):
+        self.last_cost = cost
+        if cost > self.budget:
+            self.overruns += 1
+            self.overrun_streak += 1
+            # a single scheduling hiccup must not slow the collector down
+            if self.overrun_streak >= self.OVERRUN_STREAK:
+                self.overrun_streak = 0
+                self.slowdown = min(self.slowdown * 2, self.MAX_SLOWDOWN)
+        else:
+            self.overrun_streak = 0
+            if self.slowdown > 1:
+                self.slowdown //= 2
+
+
+class CpuCollector(Collector):
+    name = "cpu"
+    interval = 1.0
+
+    def __init__(self, interval: float = None, budget: float = None):
+        super().__init__(interval, budget)
+        # first non-blocking call only primes psutil's counters
+        psutil.cpu_percent(interval=None)
+
+    def collect(self):
+        cpu_percent = int(psutil.cpu_percent(interval=None))
+        cpu_freq = psutil.cpu_freq()
+        return {"cpu": {
+            "load": cpu_percent,
+            "usage": cpu_percent,
+            "speedAverage": int(cpu_freq.current) if cpu_freq else 2875,
+        }}
+
+
+class MemoryCollector(Collector):
+    name = "memory"
+    interval = 2.0
+
+    def collect(self):
+        mem = psutil.virtual_memory()
+        return {"memory": {
+            "total": int(mem.total / 1024 / 1024),  # MB
+            "used": int(mem.used / 1024 / 1024),  # MB
+            "load": int(mem.percent),
+        }}
+
+
+class DiskCollector(Collector):
+    name = "disk"
+    interval = 30.0
+
+    def __init__(self, path: str = '/', interval: float = None, budget: float = None):
+        super().__init__(interval, budget)
+        self.path = path
+
+    def collect(self):
+        disk = psutil.disk_usage(self.path)
+        return {"disk": {
+            "total": int(disk.total / 1024 / 1024 / 1024),  # GB
+            "used": int(disk.used / 1024 / 1024 / 1024),  # GB
+            "load": int(disk.percent),
+        }}
+
+
+class RateMeter():
+    """Smoothed per-second rates of monotonically increasing counters.
+
+    Rates come from the difference with the previous update, so no sampling
+    sleep is needed; they are smoothed with a time constant of smoothing seconds.
+    A counter that goes backwards (device removed, counter reset) reads as 0.
+    """
+
+    def __init__(self, smoothing: float = 2.0):
+        self.smoothing = smoothing
+        self.previous = None
+        self.previous_at = 0.0
+        self.rates = {}
+
+    def update(self, counters: dict, now: float = None) -> dict:
+        if now is None:
+            now = time.monotonic()
+        if self.previous is not None:
+            elapsed = now - self.previous_at
+            if elapsed <= 0:
+                return self.rates
+            weight = 1.0 - math.exp(-elapsed / self.smoothing) if self.smoothing > 0 else 1.0
+            for key, value in counters.items():
+                rate = max(value - self.previous.get(key, value), 0) / elapsed
+                smoothed = self.rates.get(key)
+                self.rates[key] = rate if smoothed is None else smoothed + weight * (rate - smoothed)
+        self.previous = counters
+        self.previous_at = now
+        return self.rates
+
+
+class NetworkCollector(Collector):
+    """Upload and download throughput in KB/s over nics, or every interface but loopback."""
+    name = "net"
+    interval = 1.0
+
+    def __init__(self, nics: list = None, interval: float = None, budget: float = None):
+        super().__init__(interval, budget)
+        self.nics = list(nics) if nics else None
+        self.meter = RateMeter()
+
+    def collect(self):
+        sent = recv = 0
+        for nic, counters in psutil.net_io_counters(pernic=True).items():
+            if (nic in self.nics) if self.nics else nic != "lo":
+                sent += counters.bytes_sent
+                recv += counters.bytes_recv
+        rates = self.meter.update({"sent": sent, "recv": recv})
+        return {"network": {
+            "upload": int(rates.get("sent", 0) / 1024),  # KB/s
+            "download": int(rates.get("recv", 0) / 1024),  # KB/s
+        }}
+
+
+class DiskIoCollector(Collector):
+    """Read/write throughput in KB/s and busy percentage over disks, or every whole disk."""
+    name = "diskio"
+    interval = 1.0
+    VIRTUAL_PREFIXES = ("loop", "ram", "zram")
+
+    def __init__(self, disks: list = None, interval: float = None, budget: float = None):
+        super().__init__(interval, budget)
+        self.disks = list(disks) if disks else None
+        self.meter = RateMeter()
+        self._names = None
+        self._selected = ()
+
+    def _select(self, names) -> tuple:
+        if self.disks:
+            return tuple(name for name in names if name in self.disks)
+        if not os.path.isdir("/sys/block"):
+            return tuple(names)
+        # partitions (sda1, nvme0n1p1) are already counted in their disk
+        return tuple(name for name in names
+                     if os.path.exists(os.path.join("/sys/block", name))
+                     and not name.startswith(self.VIRTUAL_PREFIXES))
+
+    def collect(self):
+        counters = psutil.disk_io_counters(perdisk=True) or {}
+        names = frozenset(counters)
+        if names != self._names:
+            self._names = names
+            self._selected = self._select(names)
+        totals = {}
+        for name in self._selected:
+            disk = counters[name]
+            totals["read"] = totals.get("read", 0) + disk.read_bytes
+            totals["write"] = totals.get("write", 0) + disk.write_bytes
+            # busy_time (ms) is Linux only
+            totals[name] = getattr(disk, "busy_time", 0)
+        rates = self.meter.update(totals)
+        # busiest disk, as ms busy per second of wall time
+        busy = max((rates.get(name, 0) for name in self._selected), default=0) / 10
+        return {"disk": {
+            "readSpeed": int(rates.get("read", 0) / 1024),  # KB/s
+            "writeSpeed": int(rates.get("write", 0) / 1024),  # KB/s
+            "activity": min(int(busy), 100),  # %
+        }}
+
+
+class TemperatureCollector(Collector):
+    name = "temps"
+    interval = 2.0
+    budget = 0.02
+
+    def collect(self):
+        temps = psutil.sensors_temperatures()
+        if 'coretemp' in temps:
+            return {"cpu": {"temperature": int(temps['coretemp'][0].current)}}
+        return {}
+
+
+class FanCollector(Collector):
+    name = "fans"
+    interval = 5.0
+
+    def collect(self):
+        # mock for now
+        return {"fans": [
+            {"onBoard": True, "name": "CPU", "value": 2149},
+            {"onBoard": True, "name": "CPU_OPT", "value": 964},
+            {"onBoard": True, "name": "System 1", "value": 581},
+            {"onBoard": True, "name": "System 2", "value": 835},
+            {"onBoard": True, "name": "System 3", "value": 747}
+        ]}
+
+
+class GpuCollector(Collector):
+    name = "gpu"
+    interval = 2.0
+
+    def collect(self):
+        # mock for now
+        return {"gpu": {
+            "hasDedicated": True,
+            "load": 5,
+            "temperature": 40,
+            "fan": 0,
+            "speed": 892,
+            "power": 18,
+            "voltage": 0.745
+        }}
+
+
+class HwmonCollector(Collector):
+    name = "hwmon"
+    interval = 1.0
+    budget = 0.002
+
+    def __init__(self, sensors: HwmonSensors = None, interval: float = None, budget: float = None):
+        super().__init__(interval, budget)
+        self.sensors = sensors or HwmonSensors()
+
+    def collect(self):
+        return self.sensors.read()
+
+
+class TelemetrySampler(threading.Thread):
+    """Runs the registered collectors on their own schedules and keeps the STATE all cache.
+
+    Readers get the last published snapshot; sections are copied on publish, so a
+    snapshot is never modified after it has been handed out. Every published
+    snapshot is also recorded in history.
+    """
+    # STATE all layout with the values sent until a collector provides them
+    DEFAULTS = {
+        "network": {"upload": 0, "download": 0},
+        "memory": {"total": 0, "used": 0, "load": 0, "temperature": 0, "speed": 2266},
+        "cpu": {"load": 0, "temperature": 0, "temperaturePackage": 0, "speedAverage": 2875, "power": 9, "voltage": 0.886, "usage": 0},
+        "gpu": {"hasDedicated": True, "load": 0, "temperature": 0, "fan": 0, "speed": 0, "power": 0, "voltage": 0},
+        "disk": {"total": 0, "used": 0, "load": 0, "activity": 0, "temperature": 0, "readSpeed": 0, "writeSpeed": 0},
+        "fans": [],
+        "motherboard": {"temperature": 32, "chipsetTemperature": 44},
+    }
+
+    def __init__(self, collectors: list = None):
+        super().__init__()
+        self.daemon = True
+        self.stop_event = threading.Event()
+        self.wakeup = threading.Event()
+        self.lock = threading.Lock()
+        self.cache = copy.deepcopy(self.DEFAULTS)
+        self.collectors = {}
+        self.next_due = {}
+        self.snapshot = None
+        self.history = TelemetryHistory()
+        for collector in collectors if collectors is not None else self.default_collectors():
+            self.register(collector)
+        self.refresh(force=True)
 
-class System:
     @staticmethod
-    def get_system_data():
-        """Raccoglie i dati di sistema da inviare al display"""
-        try:
-            # cpu
-            cpu_percent = psutil.cpu_percent(interval=0.1)
-            cpu_freq = psutil.cpu_freq()
-            cpu_temp = 0
+    def default_collectors(nics: list = None, disks: list = None) -> list:
+        collectors = [CpuCollector(), MemoryCollector(), DiskCollector(), DiskIoCollector(disks), NetworkCollector(nics)]
+        sensors = HwmonSensors()
+        collectors.append(HwmonCollector(sensors))
+        # psutil and mock sources only for what hwmon could not provide
+        if sensors.cpu_temperature is None:
+            collectors.append(TemperatureCollector())
+        if not sensors.fans:
+            collectors.append(FanCollector())
+        if not sensors.gpu:
+            collectors.append(GpuCollector())
+        return collectors
+
+    def register(self, collector: Collector):
+        with self.lock:
+            self.collectors[collector.name] = collector
+            self.next_due[collector.name] = 0.0
+        self.wakeup.set()
+
+    def unregister(self, name: str):
+        with self.lock:
+            self.collectors.pop(name, None)
+            self.next_due.pop(name, None)
+
+    def refresh(self, force: bool = False) -> float:
+        """Run every collector that is due and publish a new snapshot; returns the next due time."""
+        now = time.monotonic()
+        updated = False
+        with self.lock:
+            collectors = [
+                collector for collector in self.collectors.values()
+                if force or self.next_due.get(collector.name, 0.0) <= now
+            ]
+        for collector in collectors:
+            start = time.perf_counter()
             try:
-                temps = psutil.sensors_temperatures()
-                if 'coretemp' in temps:
-                    cpu_temp = int(temps['coretemp'][0].current)
-            except:
-                cpu_temp = 33  # Default
-            
-            # memory
-            mem = psutil.virtual_memory()
-            
-            # gpu (mock for now)
-            gpu_data = {
-                "hasDedicated": True,
-                "load": 5,
-                "temperature": 40,
-                "fan": 0,
-                "speed": 892,
-                "power": 18,
-                "voltage": 0.745
+                updates = collector.collect()
+            except Exception as e:
+                collector.errors += 1
+                print(f"Errore nella raccolta dati di sistema ({collector.name}): {e}")
+                updates = None
+            collector.record_cost(time.perf_counter() - start)
+            with self.lock:
+                # unregistered while collecting: do not bring it back
+                if collector.name in self.next_due:
+                    self.next_due[collector.name] = now + collector.effective_interval()
+            if updates:
+                self._merge(updates)
+                updated = True
+
+        if updated or self.snapshot is None:
+            self.snapshot = {
+                section: list(values) if isinstance(values, list) else dict(values)
+                for section, values in self.cache.items()
             }
-            
-            # disk
-            disk = psutil.disk_usage('/')
-            
-            # network
-            net = psutil.net_io_counters()
-            
-            # fans (mock for now)
-            fans = [
-                {"onBoard": True, "name": "CPU", "value": 2149},
-                {"onBoard": True, "name": "CPU_OPT", "value": 964},
-                {"onBoard": True, "name": "System 1", "value": 581},
-                {"onBoard": True, "name": "System 2", "value": 835},
-                {"onBoard": True, "name": "System 3", "value": 747}
-            ]
-            
-            data = {
-                "network": {
-                    "upload": int(net.bytes_sent / 1024 / 1024),  # MB
-                    "download": int(net.bytes_recv / 1024 / 1024)  # MB
-                },
-                "memory": {
-                    "total": int(mem.total / 1024 / 1024),  # MB
-                    "used": int(mem.used / 1024 / 1024),  # MB
-                    "load": int(mem.percent),
-                    "temperature": 0,
-                    "speed": 2266
-                },
-                "cpu": {
-                    "load": int(cpu_percent),
-                    "temperature": cpu_temp,
-                    "temperaturePackage": 0,
-                    "speedAverage": int(cpu_freq.current) if cpu_freq else 2875,
-                    "power": 9,
-                    "voltage": 0.886,
-                    "usage": int(cpu_percent)
-                },
-                "gpu": gpu_data,
-                "disk": {
-                    "total": int(disk.total / 1024 / 1024 / 1024),  # GB
-                    "used": int(disk.used / 1024 / 1024 / 1024),  # GB
-                    "load": int(disk.percent),
-                    "activity": 0,
-                    "temperature": 0,
-                    "readSpeed": 0,
-                    "writeSpeed": 0
-                },
-                "fans": fans,
-                "motherboard": {
-                    "temperature": 32,
-                    "chipsetTemperature": 44
-                },
-                "timestamp": int(time.time() * 1000)
+            self.history.add(self.snapshot)
+        with self.lock:
+            return min(self.next_due.values(), default=now + 1.0)
+
+    def _merge(self, updates: dict):
+        for section, values in updates.items():
+            if isinstance(values, dict) and isinstance(self.cache.get(section), dict):
+                self.cache[section].update(values)
+            else:
+                self.cache[section] = values
+
+    def get_snapshot(self):
+        snapshot = self.snapshot
+        if snapshot is None:
+            return None
+        data = dict(snapshot)
+        data["timestamp"] = int(time.time() * 1000)
+        return data
+
+    def stats(self) -> dict:
+        with self.lock:
+            collectors = list(self.collectors.values())
+        return {
+            collector.name: {
+                "interval": collector.interval,
+                "effective_interval": collector.effective_interval(),
+                "budget_ms": round(collector.budget * 1000, 3),
+                "last_cost_ms": round(collector.last_cost * 1000, 3),
+                "overruns": collector.overruns,
+                "errors": collector.errors,
             }
-            
-            return data
-        except Exception as e:
-            print(f"Errore nella raccolta dati di sistema: {e}")
-            return None
\ No newline at end of file
+            for collector in collectors
+        }
+
+    def run(self):
+        next_due = time.monotonic()
+        while not self.stop_event.is_set():
+            self.wakeup.wait(max(0.0, next_due - time.monotonic()))
+            self.wakeup.clear()
+            if self.stop_event.is_set():
+                break
+            next_due = self.refresh()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wakeup.set()
+
+
+class System:
+    sampler = None
+    options = {}
+    _sampler_lock = threading.Lock()
+
+    @staticmethod
+    def configure(**options):
+        """Options for the default collectors (nics, disks); used when the sampler starts"""
+        System.options = options
+
+    @staticmethod
+    def get_sampler():
+        with System._sampler_lock:
+            if System.sampler is None:
+                System.sampler = TelemetrySampler(TelemetrySampler.default_collectors(**System.options))
+                System.sampler.start()
+        return System.sampler
+
+    @staticmethod
+    def get_system_data():
+        """Latest sampled system data; never blocks on a measurement"""
+        return System.get_sampler().get_snapshot()
@@ -0,0 +1,108 @@
+import time
+
+
+class TelemetryFilter():
+    """Decides whether a STATE all snapshot is worth sending.
+
+    A snapshot is sent when any field moved past its threshold since the last
+    snapshot that was delivered (reported through mark_sent()), or when
+    max_interval seconds went by without a delivery; otherwise it is
+    suppressed. Thresholds are looked up by "section.field", then by
+    "section", and default to 0 (any change).
+    """
+    DEFAULT_THRESHOLDS = {
+        "cpu.load": 3,
+        "cpu.usage": 3,
+        "cpu.speedAverage": 200,
+        "cpu.power": 2,
+        "cpu.voltage": 0.05,
+        "gpu.load": 3,
+        "gpu.speed": 100,
+        "gpu.power": 3,
+        "gpu.voltage": 0.05,
+        "gpu.fan": 100,
+        "memory.load": 2,
+        "memory.used": 256,
+        "disk.readSpeed": 512,
+        "disk.writeSpeed": 512,
+        "disk.activity": 5,
+        "network.upload": 64,
+        "network.download": 64,
+        "fans": 100,
+        "temperature": 1,
+    }
+    IGNORED = ("timestamp",)
+
+    def __init__(self, max_interval: float = 10.0, thresholds: dict = None):
+        self.max_interval = max_interval
+        self.thresholds = {**self.DEFAULT_THRESHOLDS, **(thresholds or {})}
+        self.last_sent = None
+        self.last_sent_at = 0.0
+        self.sent = 0
+        self.suppressed = 0
+
+    def should_send(self, data: dict, now: float = None) -> bool:
+        """Whether data is worth sending; call mark_sent() once it actually went out."""
+        if now is None:
+            now = time.monotonic()
+        if (self.last_sent is None
+                or now - self.last_sent_at >= self.max_interval
+                or self._changed(self.flatten(data))):
+            return True
+        self.suppressed += 1
+        return False
+
+    def mark_sent(self, data: dict, now: float = None):
+        self.last_sent = self.flatten(data)
+        self.last_sent_at = time.monotonic() if now is None else now
+        self.sent += 1
+
+    def _changed(self, values: dict) -> bool:
+        last = self.last_sent
+        if values.keys() != last.keys():
+            return True
+        for key, value in values.items():
+            previous = last[key]
+            if value == previous:
+                continue
+            if not isinstance(value, (int, float)) or not isinstance(previous, (int, float)):
+                return True
+            if abs(value - previous) >= self._threshold(key):
+                return True
+        return False
+
+    def _threshold(self, key: str):
+        threshold = self.thresholds.get(key)
+        if threshold is not None:
+            return threshold
+        section, _, field = key.partition('.')
+        threshold = self.thresholds.get(section)
+        if threshold is not None:
+            return threshold
+        # temperatures anywhere share one threshold
+        if "temperature" in field.lower():
+            return self.thresholds.get("temperature", 0)
+        return 0
+
+    @classmethod
+    def flatten(cls, data: dict) -> dict:
+        """STATE all snapshot as {"section.field": value}; fans are keyed by name."""
+        values = {}
+        for section, content in data.items():
+            if section in cls.IGNORED:
+                continue
+            if isinstance(content, dict):
+                for field, value in content.items():
+                    values[f"{section}.{field}"] = value
+            elif isinstance(content, list):
+                for index, item in enumerate(content):
+                    if isinstance(item, dict):
+                        values[f"{section}.{item.get('name', index)}"] = item.get("value")
+                    else:
+                        values[f"{section}.{index}"] = item
+            else:
+                values[section] = content
+        return values
+
+    def stats(self) -> dict:
+        return {"sent": self.sent, "suppressed": self.suppressed, "max_interval": self.max_interval}
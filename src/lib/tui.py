@@ -85,7 +85,7 @@ class TUI(App):
             self.set_brightness(self.brightness - 10)
             return
         elif action_id == "refresh_media_btn":
-            self.refresh_media_list()
+            self.refresh_media_list(refresh=True)
         elif action_id == "set_selected_media_btn":
             try:
                 media_list = self.query_one("#media_list", ListView)
@@ -423,11 +423,11 @@ class TUI(App):
         bar = "#" * filled + "-" * (length - filled)
         return f"[{bar}] {self.brightness}"
 
-    def refresh_media_list(self):
+    def refresh_media_list(self, refresh: bool = False):
         media_list = self.query_one("#media_list", ListView)
         media_list.clear()
         try:
-            media_files = self.client.get_media_files()
+            media_files = self.client.get_media_files(refresh)
         except Exception:
             media_files = []
         for media in media_files:
@@ -476,7 +476,7 @@ class TUI(App):
         elif key in ("right", "l"):
             self.set_brightness(self.brightness + 10)
         elif key in ("r", "R"):
-            self.refresh_media_list()
+            self.refresh_media_list(refresh=True)
         elif key in ("s", "S"):
             # apply current brightness
             try:
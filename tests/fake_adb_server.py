@@ -0,0 +1,137 @@
+"""Minimal adb server for tests: host requests, shell: and sync: against a local directory.
+
+Device paths are mapped below root, so /sdcard/pcMedia is root/sdcard/pcMedia.
+"""
+import os
+import socket
+import socketserver
+import struct
+import subprocess
+import threading
+
+
+def read_exact(sock, length: int) -> bytes:
+    data = b""
+    while len(data) < length:
+        chunk = sock.recv(length - len(data))
+        if not chunk:
+            raise EOFError
+        data += chunk
+    return data
+
+
+class FakeADBHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        sock = self.request
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            while True:
+                request = read_exact(sock, int(read_exact(sock, 4), 16)).decode()
+                if request == "host:version":
+                    sock.sendall(b"OKAY00040029")
+                    return
+                if request == "host:devices":
+                    reply = b"FAKE0001\tdevice\n"
+                    sock.sendall(b"OKAY%04x" % len(reply) + reply)
+                    return
+                if request in ("host:transport-any", "host:transport:FAKE0001"):
+                    sock.sendall(b"OKAY")
+                    continue
+                if request.startswith("shell:"):
+                    sock.sendall(b"OKAY")
+                    result = subprocess.run(["sh", "-c", request[len("shell:"):]],
+                                            cwd=self.server.root, capture_output=True)
+                    sock.sendall(result.stdout + result.stderr)
+                    return
+                if request == "sync:":
+                    sock.sendall(b"OKAY")
+                    self.sync(sock)
+                    return
+                message = f"unknown service {request}".encode()
+                sock.sendall(b"FAIL%04x" % len(message) + message)
+                return
+        except EOFError:
+            pass
+
+    def local(self, path: str) -> str:
+        return os.path.join(self.server.root, path.lstrip("/"))
+
+    def fail(self, sock, message: str):
+        data = message.encode()
+        sock.sendall(b"FAIL" + struct.pack("<I", len(data)) + data)
+
+    def sync(self, sock):
+        while True:
+            ident, length = struct.unpack("<4sI", read_exact(sock, 8))
+            if ident == b"QUIT":
+                return
+            path = read_exact(sock, length).decode()
+            if ident == b"LIST":
+                directory = self.local(path)
+                if os.path.isdir(directory):
+                    for name in [".", ".."] + sorted(os.listdir(directory)):
+                        st = os.lstat(os.path.join(directory, name))
+                        encoded = name.encode()
+                        sock.sendall(b"DENT" + struct.pack("<IIII", st.st_mode, st.st_size, int(st.st_mtime), len(encoded)) + encoded)
+                sock.sendall(b"DONE" + bytes(16))
+            elif ident == b"STAT":
+                try:
+                    st = os.lstat(self.local(path))
+                    sock.sendall(b"STAT" + struct.pack("<III", st.st_mode, st.st_size, int(st.st_mtime)))
+                except OSError:
+                    sock.sendall(b"STAT" + bytes(12))
+            elif ident == b"RECV":
+                try:
+                    with open(self.local(path), "rb") as f:
+                        while True:
+                            chunk = f.read(self.server.chunk_size)
+                            if not chunk:
+                                break
+                            sock.sendall(b"DATA" + struct.pack("<I", len(chunk)) + chunk)
+                    sock.sendall(b"DONE" + bytes(4))
+                except OSError as e:
+                    self.fail(sock, e.strerror or str(e))
+            elif ident == b"SEND":
+                remote, mode = path.rsplit(",", 1)
+                data = bytearray()
+                while True:
+                    ident, length = struct.unpack("<4sI", read_exact(sock, 8))
+                    if ident == b"DONE":
+                        break
+                    data += read_exact(sock, length)
+                try:
+                    with open(self.local(remote), "wb") as f:
+                        f.write(data)
+                    os.chmod(self.local(remote), int(mode) & 0o777)
+                    os.utime(self.local(remote), (length, length))
+                    sock.sendall(b"OKAY" + bytes(4))
+                except OSError as e:
+                    self.fail(sock, e.strerror or str(e))
+            else:
+                self.fail(sock, f"unknown sync request {ident!r}")
+                return
+
+
+class FakeADBServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, root: str, chunk_size: int = 65536):
+        super().__init__(("127.0.0.1", 0), FakeADBHandler)
+        self.root = root
+        self.chunk_size = chunk_size
+
+    def handle_error(self, request, client_address):
+        pass
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
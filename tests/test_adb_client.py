@@ -0,0 +1,138 @@
+import os
+import stat
+import subprocess
+
+import pytest
+
+from fake_adb_server import FakeADBServer
+from lib.adb_client import ADBClient
+from lib.adbdevice import ADBDevice
+
+
+@pytest.fixture
+def device_root(tmp_path):
+    media = tmp_path / "sdcard" / "pcMedia"
+    (media / "sub" / "deeper").mkdir(parents=True)
+    (media / "a.mp4").write_bytes(b"a" * 10)
+    (media / "notes.txt").write_bytes(b"text")
+    (media / "sub" / "b.mp4").write_bytes(b"b" * 20)
+    (media / "sub" / "deeper" / "c.mp4").write_bytes(b"c" * 30)
+    return tmp_path
+
+
+@pytest.fixture
+def server(device_root):
+    server = FakeADBServer(str(device_root), chunk_size=4096).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(server):
+    return ADBClient(port=server.port, timeout=5)
+
+
+def test_host_requests(client):
+    assert client.version() == 0x29
+    assert client.devices() == [("FAKE0001", "device")]
+    assert client.available()
+
+
+def test_unreachable_server_is_not_available():
+    assert not ADBClient(port=1, timeout=0.5).available()
+
+
+def test_shell_returns_output(client):
+    assert client.shell("echo hello; ls sdcard") == "hello\npcMedia\n"
+
+
+def test_unknown_serial_fails(server):
+    with pytest.raises(RuntimeError, match="unknown service"):
+        ADBClient(port=server.port, serial="OTHER").shell("true")
+
+
+def test_list_skips_dot_entries(client):
+    entries = {entry.name: entry for entry in client.list("/sdcard/pcMedia")}
+    assert sorted(entries) == ["a.mp4", "notes.txt", "sub"]
+    assert stat.S_ISREG(entries["a.mp4"].mode) and entries["a.mp4"].size == 10
+    assert stat.S_ISDIR(entries["sub"].mode)
+
+
+def test_list_missing_directory_is_empty(client):
+    assert client.list("/sdcard/missing") == []
+
+
+def test_walk_descends_depth_first(client):
+    names = [(directory, entry.name) for directory, entry in client.walk("/sdcard/pcMedia")]
+    assert names == [
+        ("/sdcard/pcMedia", "a.mp4"),
+        ("/sdcard/pcMedia", "notes.txt"),
+        ("/sdcard/pcMedia", "sub"),
+        ("/sdcard/pcMedia/sub", "b.mp4"),
+        ("/sdcard/pcMedia/sub", "deeper"),
+        ("/sdcard/pcMedia/sub/deeper", "c.mp4"),
+    ]
+
+
+def test_stat(client):
+    entry = client.stat("/sdcard/pcMedia/sub/b.mp4")
+    assert entry.name == "b.mp4" and entry.size == 20 and stat.S_ISREG(entry.mode)
+    assert client.stat("/sdcard/pcMedia/nope.mp4").mode == 0
+
+
+def test_push_pull_round_trip(client, device_root, tmp_path):
+    payload = os.urandom(300 * 1024)  # several SEND DATA and RECV DATA chunks
+    local = tmp_path / "upload.mp4"
+    local.write_bytes(payload)
+    os.utime(local, (1700000000, 1700000000))
+
+    client.push(str(local), "/sdcard/pcMedia/upload.mp4", mode=0o600)
+    remote = device_root / "sdcard" / "pcMedia" / "upload.mp4"
+    assert remote.read_bytes() == payload
+    assert stat.S_IMODE(remote.stat().st_mode) == 0o600
+    assert int(remote.stat().st_mtime) == 1700000000
+
+    back = tmp_path / "download.mp4"
+    client.pull("/sdcard/pcMedia/upload.mp4", str(back))
+    assert back.read_bytes() == payload
+
+
+def test_recv_streams_chunks(client):
+    with client.sync() as sync:
+        chunks = list(sync.recv("/sdcard/pcMedia/a.mp4"))
+        # the connection stays usable after a transfer
+        assert sync.stat("/sdcard/pcMedia/a.mp4").size == 10
+    assert b"".join(chunks) == b"a" * 10
+
+
+def test_pull_failure_removes_partial_file(client, tmp_path):
+    local = tmp_path / "missing.mp4"
+    with pytest.raises(RuntimeError, match="adb sync failed"):
+        client.pull("/sdcard/pcMedia/missing.mp4", str(local))
+    assert not local.exists()
+
+
+def test_push_failure_is_reported(client, tmp_path):
+    local = tmp_path / "upload.mp4"
+    local.write_bytes(b"data")
+    with pytest.raises(RuntimeError, match="adb sync failed"):
+        client.push(str(local), "/sdcard/no/such/dir/upload.mp4")
+
+
+def test_adbdevice_lists_media_like_find(client):
+    device = ADBDevice.__new__(ADBDevice)
+    device.client = client
+    assert device.list_mp4_files("/sdcard/pcMedia") == ["a.mp4", "b.mp4", "c.mp4"]
+
+
+class FailingShell():
+    def run(self, command, timeout=10):
+        return subprocess.CompletedProcess(command, 1, "", "")
+
+
+def test_adbdevice_reports_a_failed_listing():
+    device = ADBDevice.__new__(ADBDevice)
+    device.client = ADBClient(port=1, timeout=1)
+    device.shell = FailingShell()
+    with pytest.raises(RuntimeError, match="listing /sdcard/pcMedia failed"):
+        device.list_mp4_files("/sdcard/pcMedia")
@@ -0,0 +1,32 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("hid")
+pytest.importorskip("psutil")
+
+from lib.async_hiddevice import AsyncHIDDevice
+from lib.emulator import EmulatorBackend
+from lib.hiddevice import HIDDevice
+from lib.scheduler import IOScheduler
+
+
+@pytest.fixture
+def device():
+    device = HIDDevice(0x1C75, 0x1C76, backend=EmulatorBackend(latency=0.5, seed=0))
+    yield AsyncHIDDevice(device)
+    device.close()
+
+
+def test_send_does_not_wait_for_a_reply_at_any_priority(device):
+    start = time.monotonic()
+    assert asyncio.run(device.send("POST conn", priority=IOScheduler.CONFIG)) is None
+    assert time.monotonic() - start < 0.25
+    assert device.device.backend.emulated.received["POST conn"] == 1
+
+
+def test_request_waits_for_the_reply(device):
+    response = asyncio.run(device.request("POST conn"))
+    assert response is not None
+    assert response.json() == {"code": 200}
@@ -0,0 +1,39 @@
+import json
+import threading
+
+from lib.display_config import DisplayConfig
+
+
+def test_partial_nested_settings_keep_defaults():
+    config = DisplayConfig({"settings": {"titleColor": "#000000", "filter": {"opacity": 50}}})
+    settings = config.settings["settings"]
+    assert settings["titleColor"] == "#000000"
+    assert settings["contentColor"] == DisplayConfig.DEFAULTS["settings"]["contentColor"]
+    assert settings["filter"] == {"value": None, "opacity": 50}
+    assert settings["badges"] == []
+    assert DisplayConfig.DEFAULTS["settings"]["titleColor"] == "#E5252B"
+
+
+def test_render_matches_json_dumps():
+    config = DisplayConfig({"timeZone": "UTC"})
+    for media, brightness in ((["a.mp4"], 200), (["a.mp4", "b.mp4"], 0), ([], 255)):
+        expected = json.dumps(config.to_dict(media, brightness), separators=(',', ':'))
+        assert config.render(media, brightness) == expected
+
+
+def test_concurrent_render_keeps_media_and_json_together():
+    config = DisplayConfig()
+    mismatches = []
+
+    def render(media_file):
+        for brightness in range(2000):
+            rendered = json.loads(config.render([media_file], brightness % 256))
+            if rendered["waterBlockScreen"]["id"]["media"] != [media_file]:
+                mismatches.append(media_file)
+
+    threads = [threading.Thread(target=render, args=(f"{i}.mp4",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not mismatches
@@ -0,0 +1,42 @@
+import math
+
+from lib.history import HistoryTier, TelemetryHistory
+
+
+def test_wall_clock_step_back_keeps_recording():
+    history = TelemetryHistory((("1m", 1.0, 60),))
+    wall = 1_700_000_000.0
+    for second in range(30):
+        history.add({"cpu": {"load": second}}, timestamp=wall + second, clock=100.0 + second)
+    # NTP steps the wall clock back one hour; the monotonic clock carries on
+    for second in range(30, 60):
+        history.add({"cpu": {"load": second}}, timestamp=wall - 3600 + second, clock=100.0 + second)
+
+    result = history.query("1m")
+    values = result["metrics"]["cpu.load"]["values"]
+    assert values == [float(second) for second in range(60)]
+    assert result["timestamps"][0] == wall
+    assert result["timestamps"][-1] == wall - 3600 + 59
+
+
+def test_aggregates_skip_empty_buckets():
+    tier = HistoryTier("1m", 1.0, 10)
+    tier.add(0.0, {"load": 4.0})
+    tier.add(0.5, {"load": 2.0})
+    tier.add(3.0, {"load": 9.0})
+
+    metric = tier.query()["metrics"]["load"]
+    assert metric["values"] == [3.0, None, None, 9.0]
+    assert metric["min"] == 2.0
+    assert metric["max"] == 9.0
+    assert metric["avg"] == 6.0
+
+
+def test_ring_keeps_the_last_slots():
+    tier = HistoryTier("1m", 1.0, 4)
+    for second in range(10):
+        tier.add(float(second), {"load": float(second)})
+    result = tier.query(["load"])
+    assert result["metrics"]["load"]["values"] == [6.0, 7.0, 8.0, 9.0]
+    assert result["timestamps"] == [6.0, 7.0, 8.0, 9.0]
+    assert not math.isnan(result["metrics"]["load"]["avg"])
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+pytest.importorskip("psutil")
+
+from lib.keppalive_thread import KeepaliveThread
+from lib.power_policy import PowerPolicy
+from lib.system import System
+
+
+class CountingDevice():
+    def __init__(self):
+        self.keepalives = []
+
+    def send_keepalive(self, timeout=None):
+        self.keepalives.append(time.monotonic())
+        return True
+
+    def send_system_state(self, system_data=None):
+        return True
+
+
+def start(policy):
+    device = CountingDevice()
+    thread = KeepaliveThread(device, interval=0.05, send_system_data=False, power_policy=policy)
+    thread.start()
+    return device, thread
+
+
+def test_activity_while_dimmed_does_not_force_heartbeats():
+    policy = PowerPolicy(interval=0.05, max_interval=1.0, brightness=0)
+    device, thread = start(policy)
+    try:
+        end = time.monotonic() + 0.5
+        while time.monotonic() < end:
+            thread.activity()
+            time.sleep(0.01)
+        assert policy.mode == PowerPolicy.DIMMED
+        assert len(device.keepalives) <= 1
+    finally:
+        thread.stop()
+        thread.join()
+
+
+def test_activity_leaving_idle_serves_a_tick_at_once():
+    # the host's real CPU load must not keep the policy active
+    policy = PowerPolicy(interval=0.05, max_interval=1.0, idle_after=0.1, idle_load=101, brightness=100)
+    device, thread = start(policy)
+    try:
+        time.sleep(0.4)
+        assert policy.mode == PowerPolicy.IDLE
+        sent = len(device.keepalives)
+        thread.activity()
+        time.sleep(0.02)
+        assert policy.mode == PowerPolicy.ACTIVE
+        assert len(device.keepalives) == sent + 1
+    finally:
+        thread.stop()
+        thread.join()
+
+
+def test_busy_host_stays_active_without_telemetry(monkeypatch):
+    monkeypatch.setattr(System, "get_system_data", staticmethod(lambda: {"cpu": {"load": 90}}))
+    policy = PowerPolicy(interval=0.05, max_interval=1.0, idle_after=0.1, brightness=100)
+    device, thread = start(policy)
+    try:
+        time.sleep(0.4)
+        assert policy.mode == PowerPolicy.ACTIVE
+    finally:
+        thread.stop()
+        thread.join()
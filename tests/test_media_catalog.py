@@ -0,0 +1,95 @@
+from lib.media_catalog import MediaCatalog
+
+
+class FakeADBDevice():
+    USER_FILE_PATH = "/sdcard/pcMedia"
+    SYSTEM_FILE_PATH = "/sdcard/pcMediaPreset"
+
+    def __init__(self, user, presets):
+        self.listing = {self.USER_FILE_PATH: user, self.SYSTEM_FILE_PATH: presets}
+        self.calls = []
+
+    def list_mp4_files(self, path):
+        self.calls.append(path)
+        listing = self.listing[path]
+        if isinstance(listing, Exception):
+            raise listing
+        return list(listing)
+
+
+def test_lookups_are_served_from_cache():
+    device = FakeADBDevice(["a.mp4"], ["RYUO_1.mp4"])
+    catalog = MediaCatalog(device)
+    assert catalog.get() == (["a.mp4"], ["RYUO_1.mp4"])
+    assert catalog.locate("a.mp4") == "user"
+    assert catalog.locate("RYUO_1.mp4") == "preset"
+    assert len(device.calls) == 2
+
+
+def test_mutations_update_the_cache():
+    device = FakeADBDevice(["a.mp4"], ["RYUO_1.mp4"])
+    catalog = MediaCatalog(device)
+    catalog.get()
+    catalog.added("b.mp4")
+    catalog.removed("a.mp4")
+    assert catalog.get() == (["b.mp4"], ["RYUO_1.mp4"])
+    assert len(device.calls) == 2
+
+
+def test_user_listing_expires_presets_do_not():
+    device = FakeADBDevice(["a.mp4"], ["RYUO_1.mp4"])
+    catalog = MediaCatalog(device, ttl=0)
+    catalog.get()
+    device.listing[device.USER_FILE_PATH] = ["a.mp4", "new.mp4"]
+    assert catalog.get() == (["a.mp4", "new.mp4"], ["RYUO_1.mp4"])
+    assert device.calls.count(device.SYSTEM_FILE_PATH) == 1
+
+
+def test_failed_preset_listing_is_retried_while_user_listing_is_fresh():
+    device = FakeADBDevice(["a.mp4"], [])
+    catalog = MediaCatalog(device, ttl=300)
+    assert catalog.get() == (["a.mp4"], [])
+
+    device.listing[device.SYSTEM_FILE_PATH] = ["RYUO_1.mp4"]
+    catalog.presets_tried_at -= MediaCatalog.MISS_RESCAN_INTERVAL
+    assert catalog.get() == (["a.mp4"], ["RYUO_1.mp4"])
+    assert device.calls.count(device.USER_FILE_PATH) == 1
+
+
+def test_failed_preset_listing_is_not_retried_on_every_lookup():
+    device = FakeADBDevice(["a.mp4"], [])
+    catalog = MediaCatalog(device)
+    for _ in range(5):
+        catalog.get()
+    assert len(device.calls) == 2
+
+
+def test_refresh_lists_everything_again():
+    device = FakeADBDevice(["a.mp4"], ["RYUO_1.mp4"])
+    catalog = MediaCatalog(device)
+    catalog.get()
+    catalog.refresh()
+    assert len(device.calls) == 4
+
+
+def test_failed_user_listing_is_not_cached():
+    device = FakeADBDevice(RuntimeError("adb shell session closed unexpectedly"), ["RYUO_1.mp4"])
+    catalog = MediaCatalog(device)
+    assert catalog.get() == ([], ["RYUO_1.mp4"])
+    assert catalog.get() == ([], ["RYUO_1.mp4"])
+    assert device.calls.count(device.USER_FILE_PATH) == 1
+
+    device.listing[device.USER_FILE_PATH] = ["a.mp4"]
+    catalog.user_failed_at -= MediaCatalog.MISS_RESCAN_INTERVAL
+    assert catalog.get() == (["a.mp4"], ["RYUO_1.mp4"])
+
+
+def test_failed_relisting_keeps_the_previous_listing():
+    device = FakeADBDevice(["a.mp4"], ["RYUO_1.mp4"])
+    catalog = MediaCatalog(device, ttl=0)
+    catalog.get()
+    device.listing[device.USER_FILE_PATH] = TimeoutError("find timed out")
+    assert catalog.get() == (["a.mp4"], ["RYUO_1.mp4"])
+    assert catalog.locate("a.mp4") == "user"
+    assert catalog.locate("missing.mp4") is None
+    assert device.calls.count(device.USER_FILE_PATH) == 2
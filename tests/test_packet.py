@@ -0,0 +1,20 @@
+from lib.packet import Packet, PacketDecoder
+
+
+def test_build_from_payload_splits_header_and_body():
+    packet = Packet.build_from_payload(b'POST conn 1\r\nSeqNumber=3\r\n\r\n{"code":200}')
+    assert bytes(packet.get_payload_header()) == b"POST conn 1\r\nSeqNumber=3"
+    assert bytes(packet.get_payload_body()) == b'{"code":200}'
+
+
+def test_build_from_payload_without_body():
+    packet = Packet.build_from_payload(b"POST conn 1\r\nSeqNumber=3")
+    assert bytes(packet.get_payload_header()) == b"POST conn 1\r\nSeqNumber=3"
+    assert bytes(packet.get_payload_body()) == b""
+
+
+def test_build_from_string_matches_parsed_packet():
+    packet = Packet.build_from_string("POST config", '{"a":"Z["}', 7)
+    parsed = PacketDecoder().feed(bytes(packet.get_bytes())[1:])[0]
+    assert bytes(parsed.get_payload_header()) == bytes(packet.get_payload_header())
+    assert bytes(parsed.get_payload_body()) == bytes(packet.get_payload_body()) == b'{"a":"Z["}'
@@ -0,0 +1,35 @@
+from lib.power_policy import PowerPolicy
+
+
+def policy(**kwargs):
+    return PowerPolicy(interval=1, max_interval=2, idle_after=30, **kwargs)
+
+
+def test_brightness_zero_dims():
+    p = policy(brightness=0)
+    assert p.update(now=p.last_activity) == PowerPolicy.DIMMED
+    assert p.heartbeat_interval() == 2
+
+
+def test_host_display_sleep_dims_when_panel_sleeps_with_it():
+    asleep = [False]
+    p = policy(brightness=100, display_in_sleep=False, display_asleep=lambda: asleep[0])
+    assert p.update(now=p.last_activity) == PowerPolicy.ACTIVE
+    asleep[0] = True
+    assert p.update(now=p.last_activity) == PowerPolicy.DIMMED
+    assert p.telemetry_interval() == p.dimmed_telemetry_interval
+    asleep[0] = False
+    assert p.update(now=p.last_activity) == PowerPolicy.ACTIVE
+
+
+def test_host_display_sleep_ignored_when_panel_stays_on():
+    p = policy(brightness=100, display_in_sleep=True, display_asleep=lambda: True)
+    assert p.update(now=p.last_activity) == PowerPolicy.ACTIVE
+
+
+def test_idle_after_no_load_or_activity():
+    p = policy(brightness=100)
+    assert p.update({"cpu": {"load": 50}}, now=p.last_activity) == PowerPolicy.ACTIVE
+    assert p.update({"cpu": {"load": 1}}, now=p.last_busy + 30) == PowerPolicy.IDLE
+    p.activity(p.last_busy + 31)
+    assert p.update(now=p.last_busy + 31) == PowerPolicy.ACTIVE
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+pytest.importorskip("hid")
+pytest.importorskip("psutil")
+
+from lib.emulator import EmulatorBackend
+from lib.hiddevice import HIDDevice
+from lib.packet import Packet, PacketDecoder, ReportSegmenter
+from lib.scheduler import IOScheduler
+
+REPORT_SIZE = 64
+
+
+class RecordingBackend(EmulatorBackend):
+    """EmulatorBackend that keeps every output report written to the device."""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.reports = []
+        write = self.emulated.write
+
+        def record(data):
+            self.reports.append(bytes(data))
+            return write(data)
+
+        self.emulated.write = record
+
+
+@pytest.fixture
+def backend():
+    return RecordingBackend(latency=0.0, seed=0)
+
+
+@pytest.fixture
+def device(backend):
+    device = HIDDevice(0x1C75, 0x1C76, report_size=REPORT_SIZE, backend=backend)
+    yield device
+    device.close()
+
+
+def media_list(entries: int) -> list:
+    return [f"2025-10-{i % 28 + 1:02d}_12-00-00-{i:03d}.mp4" for i in range(entries)]
+
+
+def test_segmenter_reassembles_frame():
+    frame = Packet.build_from_string("POST config", json.dumps({"media": media_list(50)}), 7).get_bytes()
+    reports = [bytes(report) for report in ReportSegmenter(REPORT_SIZE).reports(frame)]
+
+    assert len(reports) == -(-(len(frame) - 1) // REPORT_SIZE)
+    assert all(report[0] == frame[0] and len(report) <= REPORT_SIZE + 1 for report in reports)
+    assert b"".join(report[1:] for report in reports) == bytes(frame[1:])
+
+    packets = PacketDecoder().feed(b"".join(report[1:] for report in reports))
+    # decoded packets carry no report id
+    assert len(packets) == 1 and bytes(packets[0].get_bytes()) == bytes(frame[1:])
+
+
+def test_segmenter_passes_short_frame_through():
+    frame = Packet.build_from_string("POST conn", "", 1).get_bytes()
+    assert len(frame) <= HIDDevice.REPORT_SIZE + 1
+    assert [bytes(report) for report in ReportSegmenter(HIDDevice.REPORT_SIZE).reports(frame)] == [bytes(frame)]
+
+
+def test_multi_report_config_round_trip(device, backend):
+    media = media_list(1000)
+    payload = device.build_display_config(media, 123)
+    frame_size = len(device.build_frame("POST config", payload))
+
+    response = device.update_display(media, 123)
+
+    assert response is not None and response.json() == {"code": 200}
+    assert backend.emulated.config == json.loads(payload)
+    assert backend.emulated.config["waterBlockScreen"]["id"]["media"] == media
+    # the config frame is the only write, split into report_size chunks
+    assert len(backend.reports) == -(-(frame_size - 1) // REPORT_SIZE) > 1
+    assert all(len(report) <= REPORT_SIZE + 1 for report in backend.reports)
+    assert device.decoder.errors == 0
+
+
+def test_oversized_payload_raises(device):
+    oversized = "x" * (Packet.MAX_PAYLOAD_SIZE + 1)
+    with pytest.raises(ValueError, match="Payload too large"):
+        Packet.build_from_string("POST config", oversized, 1)
+    with pytest.raises(ValueError, match="Payload too large"):
+        device.build_frame("POST config", oversized)
+
+
+def test_oversized_request_does_not_break_transport(device):
+    oversized = "x" * (Packet.MAX_PAYLOAD_SIZE + 1)
+    assert device.wait(device.scheduler.submit(IOScheduler.CONFIG, "POST config", oversized), 1.0) is None
+    assert device.wait(device.scheduler.submit(IOScheduler.KEEPALIVE, "POST conn"), 1.0) is not None
+
+
+def test_prebuilt_frame_reply_matches_its_sequence_number(device):
+    assert device.update_display(["a.mp4"], brightness=100) is not None
+    frame = Packet.build_from_string("POST conn", "", 0).get_bytes()
+    response = device.send_and_receive(bytes(frame))
+    assert response is not None
+    assert response.sequence_number == 0
+    assert device.dispatcher.unsolicited == 0
@@ -0,0 +1,65 @@
+from lib.sensors import HwmonSensors
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def fake_sysfs(root):
+    hwmon = root / "class" / "hwmon"
+    write(hwmon / "hwmon0" / "name", "k10temp\n")
+    write(hwmon / "hwmon0" / "temp1_input", "45250\n")
+    write(hwmon / "hwmon0" / "temp1_label", "Tctl\n")
+
+    gpu = hwmon / "hwmon1"
+    write(gpu / "name", "amdgpu\n")
+    write(gpu / "temp1_input", "52000\n")
+    write(gpu / "power1_average", "35500000\n")
+    write(gpu / "device" / "gpu_busy_percent", "17\n")
+
+    board = hwmon / "hwmon2"
+    write(board / "name", "nct6798\n")
+    write(board / "temp1_input", "38000\n")
+    write(board / "temp1_label", "SYSTIN\n")
+    write(board / "temp2_input", "51000\n")
+    write(board / "temp2_label", "PCH_CHIP_TEMP\n")
+    write(board / "fan1_input", "1200\n")
+    write(board / "fan1_label", "CPU Fan\n")
+    write(board / "fan2_input", "0\n")
+    return hwmon
+
+
+def test_discover_and_read(tmp_path):
+    fake_sysfs(tmp_path)
+    sensors = HwmonSensors(str(tmp_path))
+    try:
+        assert sensors.read() == {
+            "cpu": {"temperature": 45, "temperaturePackage": 45},
+            "gpu": {"temperature": 52, "power": 35.5, "load": 17, "hasDedicated": True},
+            "motherboard": {"temperature": 38, "chipsetTemperature": 51},
+            "fans": [
+                {"onBoard": True, "name": "CPU Fan", "value": 1200},
+                {"onBoard": True, "name": "fan2", "value": 0},
+            ],
+        }
+    finally:
+        sensors.close()
+
+
+def test_read_sees_new_values_through_open_files(tmp_path):
+    hwmon = fake_sysfs(tmp_path)
+    sensors = HwmonSensors(str(tmp_path))
+    try:
+        (hwmon / "hwmon0" / "temp1_input").write_text("61000\n")
+        (hwmon / "hwmon1" / "device" / "gpu_busy_percent").write_text("99\n")
+        updates = sensors.read()
+        assert updates["cpu"]["temperature"] == 61
+        assert updates["gpu"]["load"] == 99
+    finally:
+        sensors.close()
+
+
+def test_missing_tree_reports_nothing(tmp_path):
+    sensors = HwmonSensors(str(tmp_path))
+    assert sensors.read() == {}
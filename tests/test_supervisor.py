@@ -0,0 +1,44 @@
+import time
+
+import pytest
+
+pytest.importorskip("hid")
+pytest.importorskip("psutil")
+
+from lib.emulator import EmulatorBackend
+from lib.hiddevice import HIDDevice
+
+
+class LockedBackend(EmulatorBackend):
+    """The device enumerates, but opening it fails while it is unplugged (e.g. no permission)."""
+
+    def enumerate(self, vendor_id=0, product_id=0):
+        return [{"vendor_id": vendor_id, "product_id": product_id, "product_string": "Ryuo IV (emulated)"}]
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_failing_open_backs_off_and_logs_once(capsys):
+    backend = LockedBackend(latency=0.0, seed=0)
+    device = HIDDevice(0x1C75, 0x1C76, backend=backend)
+    try:
+        backend.emulated.unplug()
+        device.connection_lost(IOError("unplugged"))
+        time.sleep(1.0)
+        # 0.05 + 0.1 + 0.2 + 0.4 s of backoff fit in one second, not thousands of attempts
+        assert device.supervisor.attempts <= 6
+        assert capsys.readouterr().out.count("Error connecting") == 1
+        assert device.supervisor.state()["last_error"] == "open failed"
+
+        backend.emulated.plug()
+        assert wait_for(lambda: device.connected)
+        assert device.send_keepalive(timeout=1.0) is not None
+    finally:
+        device.close()
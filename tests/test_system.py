@@ -0,0 +1,43 @@
+import pytest
+
+pytest.importorskip("psutil")
+
+from lib.system import Collector
+
+
+class StaticCollector(Collector):
+    name = "static"
+    interval = 1.0
+    budget = 0.01
+
+    def collect(self):
+        return {"static": {"value": 1}}
+
+
+def test_collector_without_collect_cannot_be_created():
+    class Incomplete(Collector):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_single_overrun_does_not_slow_down():
+    collector = StaticCollector()
+    collector.record_cost(0.05)
+    collector.record_cost(0.001)
+    collector.record_cost(0.05)
+    assert collector.effective_interval() == 1.0
+    assert collector.overruns == 2
+
+
+def test_sustained_overruns_back_off_and_recover_within_budget():
+    collector = StaticCollector()
+    for _ in range(Collector.OVERRUN_STREAK * 2):
+        collector.record_cost(0.05)
+    assert collector.effective_interval() == 4.0
+    # within budget, even if not under half of it
+    collector.record_cost(0.009)
+    assert collector.effective_interval() == 2.0
+    collector.record_cost(0.009)
+    assert collector.effective_interval() == 1.0
@@ -0,0 +1,59 @@
+from lib.telemetry_filter import TelemetryFilter
+
+
+def offer(f, data, now):
+    # what the keepalive thread does when the send succeeds
+    if f.should_send(data, now):
+        f.mark_sent(data, now)
+        return True
+    return False
+
+
+def test_threshold_lookup_order():
+    f = TelemetryFilter(thresholds={"cpu.fan": 7, "cpu": 5, "temperature": 2})
+    assert f._threshold("cpu.fan") == 7
+    assert f._threshold("cpu.load") == 3
+    # the section wins over the shared temperature threshold
+    assert f._threshold("cpu.temperature") == 5
+    assert f._threshold("gpu.temperature") == 2
+    assert f._threshold("gpu.temperatureHotspot") == 2
+    assert f._threshold("gpu.memoryClock") == 0
+
+
+def test_package_temperature_wobble_is_suppressed():
+    f = TelemetryFilter()
+    assert f._threshold("cpu.temperaturePackage") == 1
+    assert offer(f, {"cpu": {"temperaturePackage": 50.0}}, now=0.0)
+    assert not offer(f, {"cpu": {"temperaturePackage": 50.5}}, now=1.0)
+    assert offer(f, {"cpu": {"temperaturePackage": 51.0}}, now=2.0)
+
+
+def test_small_changes_suppressed_until_max_interval():
+    f = TelemetryFilter(max_interval=10)
+    assert offer(f, {"cpu": {"load": 20}, "timestamp": 1}, now=0.0)
+    assert not offer(f, {"cpu": {"load": 21}, "timestamp": 2}, now=5.0)
+    assert offer(f, {"cpu": {"load": 21}, "timestamp": 3}, now=10.0)
+    # the refresh restarts the interval
+    assert not offer(f, {"cpu": {"load": 22}, "timestamp": 4}, now=15.0)
+    assert f.stats() == {"sent": 2, "suppressed": 2, "max_interval": 10}
+
+
+def test_key_set_change_is_sent():
+    f = TelemetryFilter()
+    fans = [{"name": "fan1", "value": 1200}]
+    assert offer(f, {"fans": fans}, now=0.0)
+    assert not offer(f, {"fans": [{"name": "fan1", "value": 1250}]}, now=1.0)
+    assert offer(f, {"fans": fans + [{"name": "fan2", "value": 900}]}, now=2.0)
+    assert offer(f, {"fans": [{"name": "fan2", "value": 900}]}, now=3.0)
+
+
+def test_failed_send_is_offered_again():
+    f = TelemetryFilter(max_interval=10)
+    data = {"cpu": {"load": 20}}
+    # the device was unplugged: nothing went out, nothing is marked
+    assert f.should_send(data, now=0.0)
+    assert f.should_send(data, now=1.0)
+    assert f.stats()["sent"] == 0
+    assert offer(f, data, now=2.0)
+    assert not offer(f, data, now=3.0)
+    assert f.stats() == {"sent": 1, "suppressed": 1, "max_interval": 10}